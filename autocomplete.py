@@ -0,0 +1,68 @@
+import bisect
+import json
+import re
+
+# Word boundaries inside IDs, "sword" finds diamond_sword and "mine" finds story/mine_stone
+WORD_START = re.compile(r"[_/: ]")
+
+
+class PrefixIndex:
+    """Case insensitive prefix search over sorted arrays.
+
+    Names that start with the typed text come first, then names where a later
+    word starts with it. Lookups are two binary searches, so they stay well
+    under a millisecond for the few thousand IDs of a registry.
+    """
+
+    def __init__(self, values=()):
+        self._names = []
+        self._words = []
+        self._values = set()
+        self.add(values)
+
+    def add(self, values):
+        for value in values:
+            if value in self._values:
+                continue
+            self._values.add(value)
+            key = value.lower()
+            bisect.insort(self._names, (key, value))
+            for match in WORD_START.finditer(key):
+                if match.end() < len(key):
+                    bisect.insort(self._words, (key[match.end():], value))
+
+    @staticmethod
+    def _scan(entries: list, prefix: str, limit: int, found: list):
+        index = bisect.bisect_left(entries, (prefix,))
+        while index < len(entries) and len(found) < limit:
+            key, value = entries[index]
+            if not key.startswith(prefix):
+                break
+            if value not in found:
+                found.append(value)
+            index += 1
+
+    def search(self, prefix: str, limit: int = 25) -> list:
+        prefix = prefix.strip().lower()
+        found = []
+        self._scan(self._names, prefix, limit, found)
+        if prefix and len(found) < limit:
+            self._scan(self._words, prefix, limit, found)
+        return found
+
+    def __iter__(self):
+        return (value for _, value in self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+def load_registry(path: str) -> dict:
+    """Build an index for every list in the registry file, keyed by its name."""
+    try:
+        with open(path, "r") as file:
+            data = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError) as error:
+        print(f"Error reading {path}, autocomplete for IDs is disabled: {error}")
+        data = {}
+    return {kind: PrefixIndex(values) for kind, values in data.items() if isinstance(values, list)}
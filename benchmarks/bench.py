@@ -0,0 +1,254 @@
+"""Offline benchmarks for the RCON and status paths.
+
+Runs against the local stand-ins in benchmarks/fake_servers.py, no Minecraft
+server needed. From the repository root:
+
+    python -m benchmarks.bench --latency 0.002 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from benchmarks.fake_servers import FakeRconServer, FakeStatusServer
+from rcon import RconConnection, RconPool
+from status import StatusCache, query_minecraft_server
+
+PASSWORD = "password"
+
+
+def percentile(samples: list, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(scenario: str, concurrency: int, latencies: list, errors: int, elapsed: float, **extra) -> dict:
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "ops_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        **extra,
+    }
+
+
+async def run_concurrently(operation, requests: int, concurrency: int):
+    """Run `operation()` `requests` times with at most `concurrency` at once."""
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                await operation()
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def bench_rcon_pooled(server, args, concurrency):
+    pool = RconPool("127.0.0.1", server.port, PASSWORD, size=args.pool_size)
+    try:
+        return await run_concurrently(lambda: pool.command("list"), args.requests, concurrency)
+    finally:
+        pool.close()
+
+
+async def bench_rcon_connect_per_command(server, args, concurrency):
+    # What send_rcon_command used to do: connect, authenticate, run one command, close
+    async def operation():
+        connection = RconConnection("127.0.0.1", server.port, PASSWORD)
+        await connection.connect()
+        try:
+            await connection.command("list")
+        finally:
+            connection.close()
+
+    return await run_concurrently(operation, args.requests, concurrency)
+
+
+async def bench_rcon_pipeline(server, args, concurrency):
+    pool = RconPool("127.0.0.1", server.port, PASSWORD, size=args.pool_size)
+    commands = [f"give Player{index} minecraft:stone 1" for index in range(args.batch_size)]
+
+    async def operation():
+        responses = await pool.pipeline(commands)
+        failed = [response for response in responses if isinstance(response, Exception)]
+        if failed:
+            raise failed[0]
+
+    try:
+        latencies, errors, elapsed = await run_concurrently(operation, max(1, args.requests // args.batch_size), concurrency)
+    finally:
+        pool.close()
+    # Report per command throughput, latency stays per batch
+    return latencies, errors, elapsed / args.batch_size
+
+
+async def bench_status_probe(server, args, concurrency):
+    async def operation():
+        data = await query_minecraft_server("127.0.0.1", server.port)
+        if not data["online"]:
+            raise ConnectionError("probe failed")
+
+    return await run_concurrently(operation, args.requests, concurrency)
+
+
+async def bench_status_cached(server, args, concurrency):
+    cache = StatusCache(ttl=args.cache_ttl)
+
+    async def operation():
+        data = await cache.get("127.0.0.1", server.port)
+        if not data["online"]:
+            raise ConnectionError("probe failed")
+
+    return await run_concurrently(operation, args.requests, concurrency)
+
+
+async def check_large_reply(args) -> dict:
+    size = args.large_reply
+    async with FakeRconServer(PASSWORD, handler=lambda command: "x" * size, fragment=args.fragment) as server:
+        pool = RconPool("127.0.0.1", server.port, PASSWORD)
+        started = time.perf_counter()
+        try:
+            response = await pool.command("banlist")
+        finally:
+            pool.close()
+        return {
+            "scenario": "rcon_large_reply",
+            "reply_bytes": size,
+            "received_bytes": len(response),
+            "complete": len(response) == size,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+        }
+
+
+async def measure_connection_memory(args) -> dict:
+    async with FakeRconServer(PASSWORD) as server:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        connections = []
+        for _ in range(args.memory_connections):
+            connection = RconConnection("127.0.0.1", server.port, PASSWORD)
+            await connection.connect()
+            connections.append(connection)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        for connection in connections:
+            connection.close()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "scenario": "rcon_connection_memory",
+        "connections": args.memory_connections,
+        "bytes_per_connection": allocated / args.memory_connections,
+    }
+
+
+RCON_SCENARIOS = {
+    "rcon_pooled": bench_rcon_pooled,
+    "rcon_connect_per_command": bench_rcon_connect_per_command,
+    "rcon_pipeline": bench_rcon_pipeline,
+}
+STATUS_SCENARIOS = {
+    "status_probe": bench_status_probe,
+    "status_cached": bench_status_cached,
+}
+
+CHECKS = {
+    "rcon_large_reply": check_large_reply,
+    "rcon_connection_memory": measure_connection_memory,
+}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+async def main(args):
+    server_options = {"latency": args.latency, "fragment": args.fragment, "disconnect_rate": args.disconnect_rate, "seed": args.seed}
+    results = []
+    selected = set(args.scenarios) if args.scenarios else None
+
+    for scenarios, server_class, options in (
+        (RCON_SCENARIOS, FakeRconServer, {"password": PASSWORD}),
+        (STATUS_SCENARIOS, FakeStatusServer, {"players_online": args.players}),
+    ):
+        for name, scenario in scenarios.items():
+            if selected and name not in selected:
+                continue
+            for concurrency in args.concurrency:
+                async with server_class(**options, **server_options) as server:
+                    latencies, errors, elapsed = await scenario(server, args, concurrency)
+                    result = summarize(name, concurrency, latencies, errors, elapsed, server_requests=server.requests)
+                results.append(result)
+                print(
+                    f"{name:<26} c={concurrency:<4} {result['ops_per_sec']:>9.0f} ops/s  "
+                    f"p50 {result['p50_ms']:7.2f} ms  p90 {result['p90_ms']:7.2f} ms  "
+                    f"p99 {result['p99_ms']:7.2f} ms  errors {errors}"
+                )
+
+    for name, check in CHECKS.items():
+        if selected and name not in selected:
+            continue
+        result = await check(args)
+        results.append(result)
+        print(json.dumps(result))
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "options": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=4)
+        print(f"Results written to {args.output}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the RCON and status paths against local fake servers.")
+    parser.add_argument("--requests", type=int, default=500, help="Operations per scenario and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the fake servers wait before each reply")
+    parser.add_argument("--fragment", type=int, default=0, help="Write replies in chunks of this many bytes")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="Chance of dropping the connection per request")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=10, help="Commands per batch")
+    parser.add_argument("--players", type=int, default=20, help="Players online on the fake status server")
+    parser.add_argument("--cache-ttl", type=float, default=30.0)
+    parser.add_argument("--large-reply", type=int, default=20000, help="Size of the multi-packet RCON reply check")
+    parser.add_argument("--memory-connections", type=int, default=50)
+    parser.add_argument("--scenarios", nargs="*", help="Only run these scenarios")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import random
+import struct
+from rcon import (
+    RCON_MAX_PAYLOAD, SERVERDATA_AUTH, SERVERDATA_AUTH_RESPONSE, SERVERDATA_EXECCOMMAND, SERVERDATA_RESPONSE_VALUE,
+    encode_packet
+)
+from query import HANDSHAKE, KEYS_PADDING, MAGIC, PLAYERS_PADDING, STAT
+from status import _read_slp_packet, _slp_packet, _varint
+
+# Vanilla servers read at most this many bytes per packet, one packet per read
+RCON_READ_SIZE = 1460
+
+
+class _FakeServer:
+    def __init__(self, latency: float = 0.0, fragment: int = 0, disconnect_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.fragment = fragment
+        self.disconnect_rate = disconnect_rate
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _write(self, writer: asyncio.StreamWriter, data: bytes):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not self.fragment:
+            writer.write(data)
+        else:
+            # Dribble the bytes out in small chunks to exercise reassembly
+            for offset in range(0, len(data), self.fragment):
+                writer.write(data[offset:offset + self.fragment])
+                await writer.drain()
+        await writer.drain()
+
+    def _should_disconnect(self) -> bool:
+        return self.disconnect_rate and self.random.random() < self.disconnect_rate
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            await self._serve(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Clients going away and the server shutting down are both expected
+            pass
+        finally:
+            writer.close()
+
+
+class FakeRconServer(_FakeServer):
+    """An asyncio stand-in for the RCON listener of a vanilla server.
+
+    Commands are answered by `handler(command) -> str`, which echoes by default.
+    A handler returning None leaves the command unanswered.
+    Replies longer than 4096 characters are split over several packets, and unknown
+    packet types are answered like vanilla does, which clients use as a
+    sentinel for the end of a multi-packet reply. Like vanilla, every socket
+    read must hold exactly one packet, otherwise the connection is dropped and
+    counted in `protocol_errors`.
+    """
+
+    def __init__(self, password: str = "password", handler=None, **kwargs):
+        super().__init__(**kwargs)
+        self.password = password
+        self.handler = handler or (lambda command: f"Echo: {command}")
+        self.protocol_errors = 0
+
+    async def _read_packet(self, reader):
+        data = await reader.read(RCON_READ_SIZE)
+        if len(data) < 10:
+            raise ConnectionResetError("Client closed the connection")
+        (length,) = struct.unpack_from("<i", data)
+        if length != len(data) - 4:
+            self.protocol_errors += 1
+            raise ConnectionResetError("Read did not hold exactly one packet")
+        request_id, packet_type = struct.unpack_from("<ii", data, 4)
+        return request_id, packet_type, data[12:-2].decode("utf8", errors="replace")
+
+    async def _serve(self, reader, writer):
+        authenticated = False
+        while True:
+            request_id, packet_type, payload = await self._read_packet(reader)
+            if not authenticated:
+                if packet_type != SERVERDATA_AUTH:
+                    return
+                authenticated = payload == self.password
+                await self._write(writer, encode_packet(request_id if authenticated else -1, SERVERDATA_AUTH_RESPONSE, ""))
+                continue
+
+            self.requests += 1
+            if self._should_disconnect():
+                return
+            if packet_type == SERVERDATA_EXECCOMMAND:
+                response = self.handler(payload)
+            else:
+                response = f"Unknown request {packet_type:x}"
+            if response is None:
+                # Stalls without answering, like a server that hangs on a command
+                continue
+
+            # Like vanilla, split by characters, so a part may be longer in bytes
+            chunks = [
+                response[offset:offset + RCON_MAX_PAYLOAD].encode("utf8")
+                for offset in range(0, len(response), RCON_MAX_PAYLOAD)
+            ] or [b""]
+            packets = b"".join(
+                struct.pack("<i", len(chunk) + 10) + struct.pack("<ii", request_id, SERVERDATA_RESPONSE_VALUE) + chunk + b"\x00\x00"
+                for chunk in chunks
+            )
+            await self._write(writer, packets)
+
+
+class FakeStatusServer(_FakeServer):
+    """An asyncio stand-in for the Server List Ping listener."""
+
+    def __init__(self, players_online: int = 10, max_players: int = 100, sample_size: int = 12, version: str = "1.21", **kwargs):
+        super().__init__(**kwargs)
+        self.players_online = players_online
+        self.max_players = max_players
+        self.sample_size = sample_size
+        self.version = version
+
+    def status_payload(self) -> dict:
+        sample = [
+            {"name": f"Player{index}", "id": f"00000000-0000-0000-0000-{index:012d}"}
+            for index in range(min(self.players_online, self.sample_size))
+        ]
+        return {
+            "version": {"name": self.version, "protocol": 767},
+            "players": {"online": self.players_online, "max": self.max_players, "sample": sample},
+            "description": {"text": "A fake Minecraft server"},
+        }
+
+    async def _serve(self, reader, writer):
+        await _read_slp_packet(reader)  # Handshake
+        while True:
+            packet = await _read_slp_packet(reader)
+            self.requests += 1
+            if self._should_disconnect():
+                return
+            if packet[0] == 0x00:
+                body = json.dumps(self.status_payload()).encode("utf8")
+                await self._write(writer, _slp_packet(0x00, _varint(len(body)) + body))
+            elif packet[0] == 0x01:
+                await self._write(writer, _slp_packet(0x01, packet[1:]))
+                return
+
+
+class FakeQueryServer(asyncio.DatagramProtocol):
+    """An asyncio stand-in for the UDP Query listener of a vanilla server.
+
+    Like vanilla, one challenge is kept per client address together with the
+    session ID of the handshake that issued it, and full stat replies carry
+    that session ID rather than the one of the stat request. Stat requests
+    with an unknown token are ignored. `rotate()` drops every challenge, like
+    the server does every 30 seconds.
+    """
+
+    def __init__(self, players: list = None, plugins: str = "", latency: float = 0.0):
+        self.players = ["Alice", "Bob"] if players is None else players
+        self.plugins = plugins
+        self.latency = latency
+        self.handshakes = 0
+        self.requests = 0
+        self.ignored = 0
+        self._challenges = {}
+        self._transport = None
+
+    @property
+    def port(self) -> int:
+        return self._transport.get_extra_info("sockname")[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: self, local_addr=(host, port)
+        )
+        return self
+
+    async def stop(self):
+        self._transport.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def rotate(self):
+        self._challenges.clear()
+
+    def full_stat_payload(self) -> bytes:
+        values = {
+            "hostname": "A fake Minecraft server", "gametype": "SMP", "game_id": "MINECRAFT",
+            "version": "1.21", "plugins": self.plugins, "map": "world",
+            "numplayers": str(len(self.players)), "maxplayers": "20",
+            "hostport": "25565", "hostip": "127.0.0.1",
+        }
+        keys = b"".join(key.encode() + b"\x00" + value.encode("utf8") + b"\x00" for key, value in values.items())
+        players = b"".join(name.encode("utf8") + b"\x00" for name in self.players)
+        return KEYS_PADDING + keys + b"\x00" + PLAYERS_PADDING + players + b"\x00"
+
+    def datagram_received(self, data: bytes, addr):
+        if len(data) < 7 or not data.startswith(MAGIC):
+            return
+        packet_type, session = data[2], data[3:7]
+        if packet_type == HANDSHAKE:
+            self.handshakes += 1
+            token = random.randint(-2 ** 31, 2 ** 31 - 1)
+            self._challenges[addr] = (token, session)
+            self._reply(bytes([HANDSHAKE]) + session + str(token).encode() + b"\x00", addr)
+        elif packet_type == STAT:
+            self.requests += 1
+            challenge = self._challenges.get(addr)
+            if challenge is None or data[7:11] != struct.pack(">i", challenge[0]) or len(data) != 15:
+                self.ignored += 1
+                return
+            self._reply(bytes([STAT]) + challenge[1] + self.full_stat_payload(), addr)
+
+    def _reply(self, data: bytes, addr):
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self._transport.sendto, data, addr)
+        else:
+            self._transport.sendto(data, addr)
@@ -1,90 +1,516 @@
+import asyncio
+import contextvars
 import discord
+import hashlib
+import io
+import json
+from time import perf_counter
 from discord.ext import commands, tasks
 from discord import app_commands
-from mcstatus import JavaServer
-from mcrcon import MCRcon
 from config import *
+from rcon import RconPool
+from status import AddressCache, StatusCache, query_minecraft_server
+from presence import PresenceScheduler
+from roles import AdminRoles
+from sessions import SessionTracker
+from timeseries import TimeSeriesStore, render_chart, Figure
+from logtail import LogFollower, LogRelay, classify
+from outbound import NOTIFICATION, PRESENCE, Dispatcher
+from throttle import InFlight, Throttle
+from moderation import ACTIONS, BulkRun, parse_targets
+from scheduler import MISSED_POLICIES, Scheduler, parse_schedule
+from autocomplete import PrefixIndex, load_registry
+from circuit import CircuitBreaker
+from query import QueryClient
+from metrics import registry
+from pagination import PaginatorView, paginate
+from response_cache import ResponseCache
+from rcon_parser import command_error, command_family, metric_command, parse_response
+from loop_watchdog import LoopWatchdog, enable_blocking_io_debug
+
+RCON_LATENCY = registry.histogram("rcon_command_duration_seconds", "RCON command round-trip time by command name.")
+RCON_ERRORS = registry.counter("rcon_command_errors_total", "Failed RCON commands by failure type.")
+STATUS_PROBE_LATENCY = registry.histogram("status_probe_duration_seconds", "Server List Ping probe duration by server.")
+STATUS_PROBES = registry.counter("status_probes_total", "Server List Ping probes by server and result.")
+INTERACTION_LATENCY = registry.histogram("interaction_first_response_seconds", "Time from receiving an interaction to its first response, by command.")
+INTERACTION_DELIVERY = registry.histogram("interaction_delivery_seconds", "Time from Discord creating an interaction to the bot receiving it.")
+EVENT_LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop heartbeat woke up.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+EVENT_LOOP_STALLS = registry.counter("event_loop_stalls_total", "Times the event loop was blocked longer than WATCHDOG_THRESHOLD.")
+RCON_CACHE = registry.counter("rcon_cache_requests_total", "Read-only RCON command cache lookups by command and result.")
+PRESENCE_UPDATES = registry.counter("presence_updates_total", "Presence updates by result (sent or skipped).")
+COMMANDS_THROTTLED = registry.counter("commands_throttled_total", "Commands rejected by the per user throttle, by command.")
+RCON_CIRCUIT = registry.counter("rcon_circuit_transitions_total", "RCON circuit breaker state changes by server and new state.")
+RCON_DEDUPLICATED = registry.counter("rcon_commands_deduplicated_total", "RCON commands that joined an identical command already in flight.")
+
+throttle = Throttle(THROTTLE_RATE, THROTTLE_BURST, COMMAND_THROTTLES)
+
+# The interaction whose command is running, so slow RCON calls can defer it
+current_interaction = contextvars.ContextVar("current_interaction", default=None)
+
+class InstrumentedTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["received"] = perf_counter()
+        current_interaction.set(interaction)
+        INTERACTION_DELIVERY.observe((discord.utils.utcnow() - interaction.created_at).total_seconds())
+        if interaction.type is not discord.InteractionType.application_command or interaction.command is None:
+            return True
+        command = interaction.command.qualified_name
+        retry_after = throttle.retry_after(interaction.user.id, interaction.guild_id, command)
+        if retry_after:
+            COMMANDS_THROTTLED.inc(command=command)
+            await respond(interaction, f"You are using `/{command}` too often. Try again in {retry_after:.1f} seconds.", ephemeral=True)
+            return False
+        return True
 
 intents = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = commands.Bot(command_prefix="!", intents=intents, tree_cls=InstrumentedTree)
+
+servers = {server["name"]: server for server in SERVERS}
+DEFAULT_SERVER = SERVERS[0]["name"]
+
+rcon_pools = {
+    name: RconPool(
+        server["rcon_host"], server["rcon_port"], server["rcon_password"],
+        size=RCON_POOL_SIZE, timeout=RCON_TIMEOUT, max_in_flight=RCON_MAX_IN_FLIGHT
+    )
+    for name, server in servers.items()
+}
+
+rcon_breakers = {
+    name: CircuitBreaker(
+        name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT,
+        on_change=lambda server, state: RCON_CIRCUIT.inc(server=server, state=state)
+    )
+    for name in servers
+}
+
+class ServerName(app_commands.Transformer):
+    async def transform(self, interaction: discord.Interaction, value: str) -> str:
+        return value
+
+    async def autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in servers if current.lower() in name.lower()
+        ][:25]
+
+Server = app_commands.Transform[str, ServerName]
+
+# Everything autocomplete needs is in memory, Discord only waits a moment for suggestions
+registry_ids = load_registry(REGISTRY_FILE)
+locate_targets = PrefixIndex(
+    [f"structure {name}" for name in registry_ids.get("structures", ())]
+    + [f"biome {name}" for name in registry_ids.get("biomes", ())]
+)
+known_players = PrefixIndex()
+known_players_loaded = False
+
+def autocomplete_choices(values) -> list:
+    return [app_commands.Choice(name=value, value=value) for value in values]
 
-def send_rcon_command(command):
+async def complete_player(interaction: discord.Interaction, current: str):
+    return autocomplete_choices(known_players.search(current))
+
+async def complete_locate(interaction: discord.Interaction, current: str):
+    return autocomplete_choices(locate_targets.search(current))
+
+def complete_registry(kind):
+    index = registry_ids.get(kind, PrefixIndex())
+
+    async def complete(interaction: discord.Interaction, current: str):
+        return autocomplete_choices(index.search(current))
+    return complete
+
+def record_rcon_metrics(result, started):
+    name = metric_command(result.command)
+    RCON_LATENCY.observe(perf_counter() - started, command=name)
+    if not result.success:
+        RCON_ERRORS.inc(type=result.error, command=name)
+
+response_cache = ResponseCache(
+    policies={"seed": SEED_CACHE_TTL, "banlist": BANLIST_CACHE_TTL, "list": LIST_CACHE_TTL},
+    invalidations={"ban": {"banlist"}, "ban-ip": {"banlist"}, "pardon": {"banlist"}, "pardon-ip": {"banlist"}, "kick": {"list"}},
+    counter=RCON_CACHE
+)
+
+def unreachable_response(command, breaker):
+    retry = f", retrying in {breaker.retry_after:.0f}s" if breaker.retry_after else ""
+    return parse_response(command, f"Command error: Server unreachable{retry}")
+
+async def run_rcon_command(command, server):
+    pool = rcon_pools.get(server)
+    if pool is None:
+        return parse_response(command, f"Command error: Unknown server {server}")
+    breaker = rcon_breakers[server]
+    if not breaker.allow():
+        return unreachable_response(command, breaker)
+    started = perf_counter()
     try:
-        with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as rcon_client:
-            response = rcon_client.command(command)
-            return response
+        response = await pool.command(command, RCON_COMMAND_TIMEOUTS.get(command_family(command)))
     except Exception as error:
-        return f"Command error: {error}"
+        response = command_error(error)
+    result = parse_response(command, response)
+    record_rcon_metrics(result, started)
+    breaker.record([result])
+    return result
 
-# Config for simple query
+# Identical commands sent while one is still running share its result
+rcon_in_flight = InFlight()
 
+async def auto_defer(awaitable):
+    """Await `awaitable`, deferring the running command's interaction if it takes longer than AUTO_DEFER_AFTER."""
+    interaction = current_interaction.get()
+    if interaction is None or interaction.response.is_done():
+        return await awaitable
+    task = asyncio.ensure_future(awaitable)
+    done, _ = await asyncio.wait({task}, timeout=AUTO_DEFER_AFTER)
+    if not done and not interaction.response.is_done():
+        try:
+            await defer(interaction)
+        except discord.HTTPException as error:
+            print(f"Error deferring interaction: {error}")
+    return await task
 
-@tasks.loop(minutes=1)
+async def send_rcon_command(command, server=None):
+    return await auto_defer(dispatch_rcon_command(command, server))
+
+async def dispatch_rcon_command(command, server=None):
+    server = server or DEFAULT_SERVER
+    if response_cache.cacheable(command):
+        return await response_cache.get(
+            server, command, lambda: run_rcon_command(command, server), is_error=lambda result: not result.success
+        )
+    key = (server, command)
+    if key in rcon_in_flight:
+        RCON_DEDUPLICATED.inc()
+    result = await rcon_in_flight.run(key, lambda: run_rcon_command(command, server))
+    if result.success:
+        response_cache.invalidate(server, command)
+    return result
+
+async def send_rcon_batch(commands, server=None):
+    pool = rcon_pools.get(server or DEFAULT_SERVER)
+    if pool is None:
+        return [parse_response(command, f"Command error: Unknown server {server}") for command in commands]
+    breaker = rcon_breakers[server or DEFAULT_SERVER]
+    if not breaker.allow():
+        return [unreachable_response(command, breaker) for command in commands]
+    timeouts = [RCON_COMMAND_TIMEOUTS.get(command_family(command)) for command in commands]
+    started = perf_counter()
+    try:
+        responses = await pool.pipeline(commands, timeouts)
+    except Exception as error:
+        responses = [error] * len(commands)
+    results = []
+    for command, response in zip(commands, responses):
+        if isinstance(response, Exception):
+            response = command_error(response)
+        result = parse_response(command, response)
+        record_rcon_metrics(result, started)
+        if result.success:
+            response_cache.invalidate(server or DEFAULT_SERVER, command)
+        results.append(result)
+    breaker.record(results)
+    return results
+
+query_client = QueryClient()
+query_ports = {(server["ip"], server["port"]): server["query_port"] for server in SERVERS}
+
+async def query_with_metrics(ip, port, **kwargs):
+    started = perf_counter()
+    data = await query_minecraft_server(
+        ip, port, query_port=query_ports.get((ip, port)), query_client=query_client, **kwargs
+    )
+    STATUS_PROBE_LATENCY.observe(perf_counter() - started, server=f"{ip}:{port}")
+    STATUS_PROBES.inc(server=f"{ip}:{port}", result="success" if data["online"] else "failure")
+    return data
+
+address_cache = AddressCache(srv=SRV_LOOKUP)
+status_cache = StatusCache(
+    ttl=STATUS_CACHE_TTL, resolver=address_cache, timeout=STATUS_TIMEOUT, probe=query_with_metrics
+)
+
+dispatcher = Dispatcher()
+
+async def respond(interaction: discord.Interaction, *args, **kwargs):
+    if interaction.response.is_done():
+        return await dispatcher.interactive(lambda: interaction.followup.send(*args, **kwargs))
+    await dispatcher.interactive(lambda: interaction.response.send_message(*args, **kwargs))
+    record_first_response(interaction)
+
+async def defer(interaction: discord.Interaction, **kwargs):
+    await dispatcher.interactive(lambda: interaction.response.defer(**kwargs))
+    record_first_response(interaction)
+
+def error_embed(response) -> discord.Embed:
+    if response.error == "unreachable":
+        return discord.Embed(
+            title="Server Unreachable",
+            description="The server is not responding to RCON, it may be down or restarting. Please try again shortly.",
+            color=discord.Color.red()
+        )
+    return discord.Embed(
+        title="Error!",
+        description="The command was unsuccessful. Please check the server logs for more details.",
+        color=discord.Color.red()
+    )
+
+def truncate(text, limit):
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+async def send_long_response(interaction: discord.Interaction, title, text, color, filename="response.txt"):
+    if len(text) > RESPONSE_FILE_THRESHOLD:
+        embed = discord.Embed(title=title, description=f"The response is {len(text)} characters long, see the attached file.", color=color)
+        await respond(interaction, embed=embed, file=discord.File(io.BytesIO(text.encode("utf8")), filename=filename))
+        return
+
+    pages = paginate(text)
+    if len(pages) == 1:
+        await respond(interaction, embed=discord.Embed(title=title, description=text, color=color))
+        return
+    view = PaginatorView(title, pages, color, interaction.user.id)
+    await respond(interaction, embed=view.embed(), view=view)
+
+def record_first_response(interaction: discord.Interaction):
+    received = interaction.extras.get("received")
+    if received is not None:
+        command = interaction.command.qualified_name if interaction.command else "unknown"
+        INTERACTION_LATENCY.observe(perf_counter() - received, command=command)
+
+presence_scheduler = PresenceScheduler(
+    interval=PRESENCE_INTERVAL, fast_interval=PRESENCE_FAST_INTERVAL,
+    max_interval=PRESENCE_MAX_INTERVAL, jitter=PRESENCE_JITTER
+)
+
+@tasks.loop(seconds=PRESENCE_INTERVAL)
 async def update_status_message():
+    players = None
     try:
-        data = await query_minecraft_server(IP, PORT)
-        if data["online"]:
-            player_count = data["players_online"]
-            max_players = data["max_players"]
+        # Fast polls only help if they see a newer result than the cache TTL allows
+        results = await status_cache.get_many(
+            [(server["ip"], server["port"]) for server in SERVERS], STATUS_CONCURRENCY,
+            max_age=presence_scheduler.max_age
+        )
+        for server, data in zip(SERVERS, results):
+            history.record(server["name"], data)
+            rcon_breakers[server["name"]].report_status(data["online"])
+            if not data["online"]:
+                session_tracker.observe(server["name"], [])
+                # The world may be reset before the server comes back
+                response_cache.clear(server["name"])
+                continue
+            known_players.add(data["player_names"])
+            if len(data["player_names"]) >= data["players_online"]:
+                # The status sample only lists a few players on busy servers,
+                # diffing it would end sessions of players who are still online
+                session_tracker.observe(server["name"], data["player_names"])
+        online = [data for data in results if data["online"]]
+        if online:
+            player_count = sum(data["players_online"] for data in online)
+            max_players = sum(data["max_players"] for data in online)
+            players = player_count
             status_message = f"{player_count}/{max_players} players online"
-            await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.playing, name=status_message))
+            if len(SERVERS) > 1:
+                status_message += f" on {len(online)}/{len(SERVERS)} servers"
         else:
-            await bot.change_presence(activity=discord.ActivityType.playing, name="Minecraft server offline")
-    
+            status_message = "Minecraft server offline"
+
+        if presence_scheduler.should_update(status_message):
+            activity = discord.Activity(type=discord.ActivityType.playing, name=status_message)
+            dispatcher.submit("presence", PRESENCE, lambda: bot.change_presence(activity=activity), replace=True)
+            presence_scheduler.updated(status_message)
+            PRESENCE_UPDATES.inc(result="sent")
+        else:
+            PRESENCE_UPDATES.inc(result="skipped")
+
     except Exception as error:
         print(f"Error updating status: {error}")
 
-async def query_minecraft_server(ip: str, port: int):
+    update_status_message.change_interval(seconds=presence_scheduler.next_interval(players, len(SERVERS)))
+
+session_tracker = SessionTracker(SESSIONS_DB)
+
+@tasks.loop(seconds=SESSION_FLUSH_INTERVAL)
+async def flush_sessions():
+    await session_tracker.flush()
+
+history = TimeSeriesStore(TIMESERIES_FILE)
+
+@tasks.loop(seconds=TIMESERIES_SNAPSHOT_INTERVAL)
+async def snapshot_history():
     try:
-        server = JavaServer.lookup(f"{ip}:{port}")
-        status = await server.async_status()
+        await asyncio.to_thread(history.write, history.snapshot())
+    except OSError as error:
+        print(f"Error saving {TIMESERIES_FILE}: {error}")
 
-        if status.players.sample:
-            player_names = [player.name for player in status.players.sample]
-        else:
-            player_names = []
-
-        return {
-            "online": True,
-            "version": status.version.name,
-            "players_online": status.players.online,
-            "max_players": status.players.max,
-            "description": status.description,
-            "player_names": player_names,
-            "ping": await server.async_ping(),
-        }
-    except Exception as error:
-        print(f"Error querying the server: {error}")
-        return {"online": False}
+LOG_EVENT_ICONS = {"chat": "💬", "join": "➕", "leave": "➖", "death": "💀", "advancement": "🏆"}
+log_relay_task = None
+
+async def relay_log():
+    delay = 5
+    while True:
+        relay_task = None
+        try:
+            channel = bot.get_channel(LOG_CHANNEL_ID) or await bot.fetch_channel(LOG_CHANNEL_ID)
+
+            async def send(text):
+                # Waiting for each message keeps the backlog in the relay's
+                # bounded buffer instead of the dispatcher queue
+                await dispatcher.submit(
+                    f"channel:{channel.id}", NOTIFICATION,
+                    lambda: channel.send(text, allowed_mentions=discord.AllowedMentions.none())
+                )
+
+            relay = LogRelay(send, interval=LOG_RELAY_INTERVAL)
+            relay_task = asyncio.create_task(relay.run())
+            async for lines in LogFollower(LOG_FILE, LOG_OFFSET_FILE).follow():
+                delay = 5
+                for line in lines:
+                    event = classify(line)
+                    if event is not None and event[0] in LOG_RELAY_EVENTS:
+                        relay.add(f"{LOG_EVENT_ICONS[event[0]]} {discord.utils.escape_markdown(event[1])}")
+        except Exception as error:
+            print(f"Log relay stopped, restarting in {delay}s: {error}")
+        finally:
+            if relay_task is not None:
+                relay_task.cancel()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 300)
+
+def format_duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 1440)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+admin_roles = AdminRoles(ADMIN_ROLES_FILE)
+
+@tasks.loop(seconds=ADMIN_ROLES_RELOAD_INTERVAL)
+async def reload_admin_roles():
+    await admin_roles.reload_if_changed()
 
 def check_admin_role(interaction) -> bool:
-    return any(role.id in ALLOWED_ROLE_ID for role in interaction.user.roles)
+    return admin_roles.is_admin(interaction.guild_id, (role.id for role in getattr(interaction.user, "roles", ())))
+
+def command_tree_hash(guild=None) -> str:
+    commands = [command.to_dict(bot.tree) for command in bot.tree.get_commands(guild=guild)]
+    payload = json.dumps(sorted(commands, key=lambda command: command["name"]), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def load_command_hashes() -> dict:
+    try:
+        with open(COMMAND_SYNC_FILE, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_command_hashes(hashes: dict):
+    with open(COMMAND_SYNC_FILE, "w") as file:
+        json.dump(hashes, file, indent=4)
+
+async def sync_commands():
+    guild = discord.Object(id=SYNC_GUILD_ID) if SYNC_GUILD_ID else None
+    if guild is not None:
+        # Guild commands update instantly, handy while developing
+        bot.tree.copy_global_to(guild=guild)
+
+    key = f"{bot.user.id}:{SYNC_GUILD_ID or 'global'}"
+    tree_hash = command_tree_hash(guild)
+    hashes = load_command_hashes()
+    if hashes.get(key) == tree_hash:
+        print("Commands unchanged, skipping sync.")
+        return
+
+    synced = await bot.tree.sync(guild=guild)
+    hashes[key] = tree_hash
+    save_command_hashes(hashes)
+    print(f"{len(synced)} commands synced.")
+
+async def report_job_failure(job, result):
+    print(f"Scheduled job {job.id} ({job.command}) failed: {result}")
+    channel = bot.get_channel(LOG_CHANNEL_ID) if LOG_CHANNEL_ID else None
+    if channel is not None:
+        embed = discord.Embed(
+            title=f"Scheduled job {job.id} failed",
+            description=f"`{truncate(job.command, 1000)}` on {job.server}",
+            color=discord.Color.red()
+        )
+        embed.set_footer(text=truncate(f"Response: {result}", 2048))
+        dispatcher.notify(channel, embed)
+
+scheduler = Scheduler(SCHEDULES_FILE, send_rcon_command, concurrency=SCHEDULE_CONCURRENCY, on_failure=report_job_failure)
+
+metrics_server = None
+loop_watchdog = LoopWatchdog(threshold=WATCHDOG_THRESHOLD, lag_histogram=EVENT_LOOP_LAG, stall_counter=EVENT_LOOP_STALLS)
 
 @bot.event
 async def on_ready():
+    global metrics_server, log_relay_task, known_players_loaded
     print(f'Logged in as {bot.user.name} ({bot.user.id})')
-    synced = await bot.tree.sync()
-    print(f"{len(synced)} commands sycned. Bot ready!")
-    update_status_message.start()  # Start the status update
+    if WATCHDOG_DEBUG and not loop_watchdog.running:
+        enable_blocking_io_debug(WATCHDOG_THRESHOLD)
+    loop_watchdog.start()
+    dispatcher.start()
+    scheduler.start()
+    if METRICS_PORT and metrics_server is None:
+        metrics_server = await registry.serve(METRICS_HOST, METRICS_PORT)
+        print(f"Metrics available on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    if not known_players_loaded:
+        # Scans the whole session table, so only on the first on_ready
+        known_players.add(await session_tracker.recent_players())
+        known_players_loaded = True
+    await sync_commands()
+    print("Bot ready!")
+    # on_ready fires again on every reconnect
+    if not update_status_message.is_running():
+        update_status_message.start()  # Start the status update
+    if not reload_admin_roles.is_running():
+        reload_admin_roles.start()
+    if not flush_sessions.is_running():
+        flush_sessions.start()
+    if not snapshot_history.is_running():
+        snapshot_history.start()
+    if LOG_FILE and LOG_CHANNEL_ID and log_relay_task is None:
+        log_relay_task = asyncio.create_task(relay_log())
 
 server_group = app_commands.Group(name="server", description="Server Commands")
 
 @server_group.command(name="status", description="Get the status of a Minecraft server")
-async def minecraft(interaction: discord.Interaction):
+async def minecraft(interaction: discord.Interaction, server: Server = None):
     print(f"Status Command: Called by {interaction.user.name}")
-    await interaction.response.defer()
-    data = await query_minecraft_server(IP, PORT)
+    if server is None and len(SERVERS) > 1:
+        await status_overview(interaction)
+        return
+    if (server or DEFAULT_SERVER) not in servers:
+        await respond(interaction, f"Unknown server {server}.", ephemeral=True)
+        return
+
+    await defer(interaction)
+    target = servers[server or DEFAULT_SERVER]
+    ip, port = target["ip"], target["port"]
+    data = await status_cache.get(ip, port)
 
     if data["online"]:
         embed = discord.Embed(
-            title=f"🟢 {bot.user.name} Status",
-            description=f"{IP}:{PORT} is **online**!",
+            title=f"🟢 {target['name']} Status",
+            description=f"{ip}:{port} is **online**!",
             color=discord.Color.green()
         )
-        ping = data['ping'] * 100
+        ping = data['ping']
         embed.add_field(name="🌍 Version", value=data["version"], inline=True)
         embed.add_field(name="📝 Description", value=str(data["description"]), inline=False)
         embed.add_field(name="📡 Ping", value=f"{ping:.2f} ms", inline=True)
+        if "software" in data:
+            plugins = ", ".join(data["plugins"]) or "None"
+            embed.add_field(name="🧩 Software", value=truncate(f"{data['software']}\nPlugins: {plugins}", 1024), inline=True)
+            embed.add_field(name="🗺️ Map", value=data["map"] or "Unknown", inline=True)
 
         if data["players_online"] > 0:
             players_list = data["player_names"]
@@ -96,347 +522,329 @@ async def minecraft(interaction: discord.Interaction):
             embed.add_field(name=f"👥 Players Online {data['players_online']}/{data['max_players']}", value="No players online.", inline=False)
 
         embed.set_thumbnail(url="https://i.ibb.co/QJhHc3d/Userbox-creeper-svg.png")
-        await interaction.followup.send(embed=embed)
+        timings = data["timings"]
+        embed.set_footer(text=(
+            f"Updated {data['age']:.0f}s ago | Probe {timings['total']:.0f} ms "
+            f"(connect {timings['connect']:.0f}, status {timings['status']:.0f}, ping {timings['ping']:.0f})"
+        ))
+        await respond(interaction, embed=embed)
 
     else:
         embed = discord.Embed(
-            title=f"🔴 {bot.name} Status",
-            description=f"{IP}:{PORT} is **offline**.",
+            title=f"🔴 {target['name']} Status",
+            description=f"{ip}:{port} is **offline**.",
             color=discord.Color.red()
         )
-        embed.set_footer(text="Server might be down or unreachable", icon_url="https://i.imgur.com/75gA21p.png")
-        await interaction.followup.send(embed=embed)
-        
+        embed.set_footer(text=f"Server might be down or unreachable. Checked {data['age']:.0f}s ago", icon_url="https://i.imgur.com/75gA21p.png")
+        await respond(interaction, embed=embed)
+
+async def status_overview(interaction: discord.Interaction):
+    await defer(interaction)
+    results = await status_cache.get_many([(server["ip"], server["port"]) for server in SERVERS], STATUS_CONCURRENCY)
+
+    embed = discord.Embed(
+        title=f"{bot.user.name} Network Status",
+        description=f"{sum(data['online'] for data in results)}/{len(SERVERS)} servers online",
+        color=discord.Color.green() if all(data["online"] for data in results) else discord.Color.orange()
+    )
+    for server, data in zip(SERVERS, results):
+        if data["online"]:
+            value = f"{data['players_online']}/{data['max_players']} players\n{data['version']} | {data['ping']:.0f} ms"
+            embed.add_field(name=f"🟢 {server['name']}", value=value, inline=True)
+        else:
+            embed.add_field(name=f"🔴 {server['name']}", value="Offline", inline=True)
+    embed.set_footer(text=f"Updated {max(data['age'] for data in results):.0f}s ago")
+    await respond(interaction, embed=embed)
+
 @app_commands.check(check_admin_role)
 @server_group.command(name="give", description="Give an item to a player")
-async def give(interaction: discord.Interaction, user: str, item: str, amount: int=1):
+@app_commands.autocomplete(user=complete_player, item=complete_registry("items"))
+async def give(interaction: discord.Interaction, user: str, item: str, amount: int=1, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
     print(f"Give Command: Called by {interaction.user.name}. Given to {user}, {item}, {amount}")
     command = f"/give {user} {item} {amount}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Item Given",
 		 description=f"**Player:** {user}\n**Item:** {item}\n**Amount:** {amount}",
 		 color=discord.Color.green()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
     
 @app_commands.check(check_admin_role)
 @server_group.command(name="teleport", description="Teleport a player to another player")
-async def teleport(interaction: discord.Interaction, player1: str, player2: str):
+@app_commands.autocomplete(player1=complete_player, player2=complete_player)
+async def teleport(interaction: discord.Interaction, player1: str, player2: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
     print(f"Teleport Command: Called by {interaction.user.name}. {player1} teleported to {player2}")
     command = f"/tp {player1} {player2}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Player Teleported",
 		 description=f"**Player:** {player1}\n**Destination:** {player2}",
 		 color=discord.Color.blue()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="spawn", description="Teleport a player to the spawn")
-async def spawn(interaction: discord.Interaction, player: str):
+@app_commands.autocomplete(player=complete_player)
+async def spawn(interaction: discord.Interaction, player: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
     print(f"Spawn Command: Called by {interaction.user.name}. {user} teleported to spawn.")
     command = f"/tp {player} ~ ~ ~"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Player Teleported to Spawn",
 		 description=f"**Player:** {player}",
 		 color=discord.Color.purple()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="kick", description="Kick a player from the server")
-async def kick(interaction: discord.Interaction, player: str, reason: str):
+@app_commands.autocomplete(player=complete_player)
+async def kick(interaction: discord.Interaction, player: str, reason: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     command = f"/kick {player} {reason}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Player Kicked",
 		 description=f"**Player:** {player}\n**Reason:** {reason}",
 		 color=discord.Color.red()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="ban", description="Ban a player from the server")
-async def ban(interaction: discord.Interaction, player: str, reason: str):
+@app_commands.autocomplete(player=complete_player)
+async def ban(interaction: discord.Interaction, player: str, reason: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     command = f"/ban {player} {reason}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Player Banned",
 		 description=f"**Player:** {player}\n**Reason:** {reason}",
 		 color=discord.Color.red()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="unban", description="Unban a player from the server")
-async def unban(interaction: discord.Interaction, player: str):
+@app_commands.autocomplete(player=complete_player)
+async def unban(interaction: discord.Interaction, player: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     command = f"/pardon {player}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Player Unbanned",
 		 description=f"**Player:** {player}",
 		 color=discord.Color.green()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="advancement", description="Grant or revoke an advancement")
-async def advancement(interaction: discord.Interaction, action: str, player: str, advancement: str):
+@app_commands.autocomplete(player=complete_player, advancement=complete_registry("advancements"))
+async def advancement(interaction: discord.Interaction, action: str, player: str, advancement: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     if action not in ["grant", "revoke"]:
-        await interaction.response.send_message("Invalid action. Use 'grant' or 'revoke'.", ephemeral=True)
+        await respond(interaction, "Invalid action. Use 'grant' or 'revoke'.", ephemeral=True)
         return
 
     command = f"/advancement {action} {player} {advancement}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Advancement Updated",
 		 description=f"**Action:** {action.capitalize()}\n**Player:** {player}\n**Advancement:** {advancement}",
 		 color=discord.Color.gold()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="summon", description="Summon an entity at specified coordinates")
-async def summon(interaction: discord.Interaction, entity: str, x: int, y: int, z: int):
+@app_commands.autocomplete(entity=complete_registry("entities"))
+async def summon(interaction: discord.Interaction, entity: str, x: int, y: int, z: int, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     command = f"/summon {entity} {x} {y} {z}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Entity Summoned",
 		 description=f"**Entity:** {entity}\n**Coordinates:** X:{x} Y:{y} Z:{z}",
 		 color=discord.Color.orange()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="setworldspawn", description="Summon an entity at specified coordinates")
-async def setspawn(interaction: discord.Interaction, x: int, y: int, z: int):
+async def setspawn(interaction: discord.Interaction, x: int, y: int, z: int, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     command = f"/setworldspawn {x} {y} {z}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="World spawn set!",
 		 description=f"Spawn set at Coordinates:** X:{x} Y:{y} Z:{z}",
 		 color=discord.Color.green()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="weather", description="Change the weather in the game")
-async def weather(interaction: discord.Interaction, weather_type: str, duration: int):
+async def weather(interaction: discord.Interaction, weather_type: str, duration: int, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     if weather_type not in ["clear", "rain", "thunder"]:
-        await interaction.response.send_message("Invalid weather type. Use 'clear', 'rain', or 'thunder'.", ephemeral=True)
+        await respond(interaction, "Invalid weather type. Use 'clear', 'rain', or 'thunder'.", ephemeral=True)
         return
 
     command = f"/weather {weather_type} {duration}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Weather Changed",
 		 description=f"**Weather Type:** {weather_type.capitalize()}\n**Duration:** {duration} seconds",
 		 color=discord.Color.blue()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="time", description="Set the time of day")
-async def time(interaction: discord.Interaction, time_of_day: str):
+async def time(interaction: discord.Interaction, time_of_day: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     if time_of_day not in ["day", "night", "midnight", "noon"]:
-        await interaction.response.send_message("Invalid time of day. Use 'day', 'night', 'midnight', or 'noon'.", ephemeral=True)
+        await respond(interaction, "Invalid time of day. Use 'day', 'night', 'midnight', or 'noon'.", ephemeral=True)
         return
 
     command = f"/time set {time_of_day}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Time Set",
 		 description=f"**Time of Day:** {time_of_day.capitalize()}",
 		 color=discord.Color.yellow()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="effect", description="Apply or remove a status effect from a player")
-async def effect(interaction: discord.Interaction, action: str, player: str, effect: str, duration: int, amplifier: int = 0):
+@app_commands.autocomplete(player=complete_player, effect=complete_registry("effects"))
+async def effect(interaction: discord.Interaction, action: str, player: str, effect: str, duration: int, amplifier: int = 0, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     if action not in ["give", "clear"]:
-        await interaction.response.send_message("Invalid action. Use 'give' or 'clear'.", ephemeral=True)
+        await respond(interaction, "Invalid action. Use 'give' or 'clear'.", ephemeral=True)
         return
 
     command = f"/effect {action} {player} {effect} {duration} {amplifier}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Effect Applied",
 		 description=f"**Action:** {action.capitalize()}\n**Player:** {player}\n**Effect:** {effect}\n**Duration:** {duration} seconds\n**Amplifier:** {amplifier}",
 		 color=discord.Color.pink()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="kill", description="Kill a player or entity")
-async def kill(interaction: discord.Interaction, target: str):
+@app_commands.autocomplete(target=complete_player)
+async def kill(interaction: discord.Interaction, target: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     command = f"/kill {target}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Target Killed",
 		 description=f"**Target:** {target}",
 		 color=discord.Color.red()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="xp", description="Adds XP or LEVEL to a player")
+@app_commands.autocomplete(player=complete_player)
 @app_commands.describe(
     action="Action to perform (add, set, query)",
     player="Target player",
@@ -448,18 +856,19 @@ async def add_xp(
     action: str,
     player: str,
     amount: int,
-    action2: str
+    action2: str,
+    server: Server = None
 ):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
         
     if action not in ["set", "add", "query"]:
-        await interaction.response.send_message("Wrong type specified. Use `set`, `add` or `query`.", ephemeral=True)
+        await respond(interaction, "Wrong type specified. Use `set`, `add` or `query`.", ephemeral=True)
         return
 
     if action2 not in ["points", "levels"]:
-        await interaction.response.send_message("Wrong type specified. Use `points` or `levels`.", ephemeral=True)
+        await respond(interaction, "Wrong type specified. Use `points` or `levels`.", ephemeral=True)
         return
 
     if action2 == "points":
@@ -467,154 +876,436 @@ async def add_xp(
     elif action2 == "levels":
         command = f"/xp {action} {player} {amount} levels"
 
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]") or response.endswith("was found"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Success!",
 		 description=f"**Target:** {player}\n**Action:** {action.capitalize()}\n**Amount:** {amount} {action2}",
 		 color=discord.Color.green()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="locate", description="Locate a specific structure or biome")
-async def locate(interaction: discord.Interaction, structure: str):
+@app_commands.autocomplete(structure=complete_locate)
+async def locate(interaction: discord.Interaction, structure: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     command = f"/locate {structure}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Structure Located",
 		 description=f"**Structure/Biome:** {structure}",
 		 color=discord.Color.green()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+	    if response.coordinates:
+	        x, y, z = response.coordinates
+	        embed.add_field(name="Coordinates", value=f"X:{x} Y:{'~' if y is None else y} Z:{z}", inline=True)
+	    if response.distance is not None:
+	        embed.add_field(name="Distance", value=f"{response.distance} blocks", inline=True)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @server_group.command(name="banlist", description="View the ban list")
-async def banlist(interaction: discord.Interaction):
+async def banlist(interaction: discord.Interaction, server: Server = None):
     command = "/banlist"
-    response = send_rcon_command(command)
-    embed = discord.Embed(
-		 title="Ban List",
-		 description="Viewing the ban list.",
-		 color=discord.Color.blue()
-	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        await respond(interaction, embed=error_embed(response))
+        return
+    if response.count is not None:
+        text = f"**{response.count} banned**\n" + "\n".join(response.entries)
+    else:
+        text = response.text
+    await send_long_response(interaction, "Ban List", text, discord.Color.blue(), filename="banlist.txt")
 
 @server_group.command(name="list", description="List all online players")
-async def list_players(interaction: discord.Interaction):
-    response = send_rcon_command("/list")
-
-    embed = discord.Embed(
-        title="Online Players",
-        description="List of all online players.",
-        color=discord.Color.green()
-    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+async def list_players(interaction: discord.Interaction, server: Server = None):
+    target = servers.get(server or DEFAULT_SERVER)
+    if target is not None and target["query_port"]:
+        # The query reply lists every player and does not use RCON at all
+        try:
+            host, _ = await address_cache.resolve(target["ip"], target["port"])
+            data = await auto_defer(query_client.full_stat(host, target["query_port"], STATUS_TIMEOUT / 3))
+            known_players.add(data["player_names"])
+            text = f"**{data['players_online']}/{data['max_players']} players online**\n" + "\n".join(data["player_names"])
+            await send_long_response(interaction, "Online Players", text, discord.Color.green(), filename="players.txt")
+            return
+        except Exception as error:
+            print(f"Error querying {target['ip']}:{target['query_port']} over UDP, falling back to RCON: {error!r}")
+    response = await send_rcon_command("/list", server)
+    if not response.success:
+        await respond(interaction, embed=error_embed(response))
+        return
+    known_players.add(response.players)
+    if response.count is not None:
+        text = f"**{response.count}/{response.max} players online**\n" + "\n".join(response.players)
+    else:
+        text = response.text
+    await send_long_response(interaction, "Online Players", text, discord.Color.green(), filename="players.txt")
 
 @server_group.command(name="seed", description="Get the world seed")
-async def seed(interaction: discord.Interaction):
-    response = send_rcon_command("/seed")
-
-    embed = discord.Embed(
-        title="World Seed",
-        description=f"**Seed:** {response}",
-        color=discord.Color.orange()
-    )
-    embed.set_footer(text="World seed fetched successfully.")
-    await interaction.response.send_message(embed=embed)
+async def seed(interaction: discord.Interaction, server: Server = None):
+    response = await send_rcon_command("/seed", server)
+    if not response.success:
+        embed = error_embed(response)
+    else:
+	    embed = discord.Embed(
+		 title="World Seed",
+		 description=f"**Seed:** {response.seed if response.seed is not None else response}",
+		 color=discord.Color.orange()
+	    )
+	    embed.set_footer(text="World seed fetched successfully.")
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role) 
 @server_group.command(name="reload", description="Reload server")
-async def reload(interaction: discord.Interaction):
+async def reload(interaction: discord.Interaction, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
-    response = send_rcon_command("/reload")
-	
-    embed = discord.Embed(
-        title="Success!",
-        description=f"{response}...\n**Server reloaded.**",
-        color=discord.Color.green()
-    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    response = await send_rcon_command("/reload", server)
+    if not response.success:
+        embed = error_embed(response)
+    else:
+	    embed = discord.Embed(
+		 title="Success!",
+		 description=f"{truncate(response.text, 4000)}...\n**Server reloaded.**",
+		 color=discord.Color.green()
+	    )
+	    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
 
 @app_commands.check(check_admin_role)
 @server_group.command(name="difficulty", description="Change the game difficulty")
-async def difficulty(interaction: discord.Interaction, level: str):
+async def difficulty(interaction: discord.Interaction, level: str, server: Server = None):
     if not check_admin_role(interaction):
-        await interaction.response.send_message("You do not have the required role to use this command.", ephemeral=True)
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
         return
 
     if level not in ["peaceful", "easy", "normal", "hard"]:
-        await interaction.response.send_message("Wrong difficulty level. Use 'peaceful', 'easy', 'normal', or 'hard'.", ephemeral=True)
+        await respond(interaction, "Wrong difficulty level. Use 'peaceful', 'easy', 'normal', or 'hard'.", ephemeral=True)
         return
 
     command = f"/difficulty {level}"
-    response = send_rcon_command(command)
-    if response.endswith("[HERE]"):
-        embed = discord.Embed(
-            title="Error!",
-            description="The command was unsuccessful. Please check the server logs for more details.",
-            color=discord.Color.red()
-        )
+    response = await send_rcon_command(command, server)
+    if not response.success:
+        embed = error_embed(response)
     else:
 	    embed = discord.Embed(
 		 title="Difficulty Changed",
 		 description=f"**New Difficulty Level:** {level.capitalize()}",
 		 color=discord.Color.purple()
 	    )
-    embed.set_footer(text=f"Response: {response}")
-    await interaction.response.send_message(embed=embed)
+    embed.set_footer(text=truncate(f"Response: {response}", 2048))
+    await respond(interaction, embed=embed)
     
+BATCH_MAX_COMMANDS = 50
+
+@app_commands.check(check_admin_role)
+@server_group.command(name="batch", description="Run several commands in one go")
+@app_commands.describe(
+    commands="Commands separated by ';'",
+    file="Text file with one command per line"
+)
+async def batch(interaction: discord.Interaction, commands: str = None, file: discord.Attachment = None, server: Server = None):
+    if not check_admin_role(interaction):
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
+        return
+
+    lines = commands.split(";") if commands else []
+    if file is not None:
+        content = await file.read()
+        lines += content.decode("utf8", errors="replace").splitlines()
+    lines = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+    if not lines:
+        await respond(interaction, "No commands given. Pass `commands` or upload a file.", ephemeral=True)
+        return
+    if len(lines) > BATCH_MAX_COMMANDS:
+        await respond(interaction, f"Too many commands. The limit is {BATCH_MAX_COMMANDS} per batch.", ephemeral=True)
+        return
+
+    print(f"Batch Command: Called by {interaction.user.name}. {len(lines)} commands")
+    await defer(interaction)
+    responses = await send_rcon_batch(lines, server)
+
+    results = []
+    failed = 0
+    not_sent = 0
+    for line, response in zip(lines, responses):
+        if response.error == "not_sent":
+            # Never reached the server, so it is safe to run again
+            not_sent += 1
+            results.append(f"⏭️ `{line}` not sent")
+        elif not response.success:
+            failed += 1
+            results.append(f"❌ `{line}` {response}")
+        else:
+            results.append(f"✅ `{line}` {response}")
+    description = "\n".join(results)
+    if len(description) > 4000:
+        description = description[:4000] + "\n..."
+
+    embed = discord.Embed(
+        title="Batch Finished",
+        description=description,
+        color=discord.Color.red() if failed or not_sent else discord.Color.green()
+    )
+    footer = f"{len(lines) - failed - not_sent}/{len(lines)} commands succeeded"
+    if not_sent:
+        footer += f", {not_sent} not sent"
+    embed.set_footer(text=footer)
+    await respond(interaction, embed=embed)
+
+BULK_MAX_PLAYERS = 1000
+BULK_PROGRESS_INTERVAL = 2
+
+def bulk_embed(run: BulkRun, finished: bool = False) -> discord.Embed:
+    title = f"Bulk {run.action.replace('_', ' ')}"
+    if finished:
+        color = discord.Color.red() if run.failed else discord.Color.green()
+        description = f"**{run.done - run.failed}/{len(run.targets)}** succeeded in {run.elapsed:.1f}s, see the attached report."
+    else:
+        color = discord.Color.orange()
+        description = f"**{run.done}/{len(run.targets)}** done..."
+    embed = discord.Embed(title=title, description=description, color=color)
+    if run.failed:
+        embed.add_field(name="Failed", value=str(run.failed))
+    if run.skipped:
+        embed.add_field(name="Skipped", value=f"{len(run.skipped)} invalid names")
+    return embed
+
+@app_commands.check(check_admin_role)
+@server_group.command(name="bulk", description="Ban, unban, kick or whitelist many players at once")
+@app_commands.describe(
+    players="Players separated by ',', each optionally followed by a reason",
+    file="Text file with one player per line, optionally followed by a reason",
+    reason="Reason for players listed without one"
+)
+@app_commands.choices(action=[app_commands.Choice(name=name.replace("_", " "), value=name) for name in ACTIONS])
+async def bulk(interaction: discord.Interaction, action: str, players: str = None, file: discord.Attachment = None, reason: str = "", server: Server = None):
+    if not check_admin_role(interaction):
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
+        return
+
+    lines = players.split(",") if players else []
+    if file is not None:
+        content = await file.read()
+        lines += content.decode("utf8", errors="replace").splitlines()
+    targets, invalid = parse_targets(lines, reason)
+
+    if not targets:
+        await respond(interaction, "No valid player names given. Pass `players` or upload a file.", ephemeral=True)
+        return
+    if len(targets) > BULK_MAX_PLAYERS:
+        await respond(interaction, f"Too many players. The limit is {BULK_MAX_PLAYERS} per run.", ephemeral=True)
+        return
+
+    print(f"Bulk Command: Called by {interaction.user.name}. {action} for {len(targets)} players")
+    await defer(interaction)
+    last_edit = 0
+
+    async def on_progress(run):
+        nonlocal last_edit
+        if perf_counter() - last_edit < BULK_PROGRESS_INTERVAL:
+            return
+        last_edit = perf_counter()
+        embed = bulk_embed(run)
+        # Queued behind interaction responses, and a newer update replaces one still waiting
+        dispatcher.submit(f"message:{message.id}", NOTIFICATION, lambda: message.edit(embed=embed), replace=True)
+
+    run = BulkRun(
+        action, targets, lambda command: send_rcon_command(command, server),
+        concurrency=BULK_CONCURRENCY, retries=BULK_RETRIES, on_progress=on_progress, skipped=invalid
+    )
+    message = await respond(interaction, embed=bulk_embed(run), wait=True)
+    last_edit = perf_counter()
+    await run.run()
+
+    embed = bulk_embed(run, finished=True)
+    report = run.report()
+    await dispatcher.submit(f"message:{message.id}", NOTIFICATION, lambda: message.edit(
+        embed=embed, attachments=[discord.File(io.BytesIO(report), filename=f"bulk_{action}.csv")]
+    ), replace=True)
+
+schedule_group = app_commands.Group(name="schedule", description="Run commands on a schedule", parent=server_group)
+
+@app_commands.check(check_admin_role)
+@schedule_group.command(name="add", description="Run a command on an interval or cron schedule")
+@app_commands.describe(
+    command="The command to run, e.g. save-all",
+    schedule="An interval like 10m or 1h30m, or a cron expression like 0 4 * * *",
+    missed="What to do with a run missed while the bot was offline"
+)
+@app_commands.choices(missed=[app_commands.Choice(name=policy, value=policy) for policy in MISSED_POLICIES])
+async def schedule_add(interaction: discord.Interaction, command: str, schedule: str, missed: str = "skip", server: Server = None):
+    if not check_admin_role(interaction):
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
+        return
+
+    server = server or DEFAULT_SERVER
+    if server not in servers:
+        await respond(interaction, f"Unknown server {server}.", ephemeral=True)
+        return
+    try:
+        job = scheduler.add(server, command, schedule, missed, created_by=interaction.user.name)
+    except ValueError as error:
+        await respond(interaction, f"Invalid schedule: {error}", ephemeral=True)
+        return
+
+    print(f"Schedule Command: Called by {interaction.user.name}. Job {job.id}: {command} ({schedule})")
+    embed = discord.Embed(
+        title="Job Scheduled",
+        description=f"**Job {job.id}:** `{truncate(command, 1000)}`\n**Schedule:** {parse_schedule(schedule)}\n**Next run:** <t:{int(job.next_run)}:R>",
+        color=discord.Color.green()
+    )
+    embed.set_footer(text=f"Server: {server}")
+    await respond(interaction, embed=embed)
+
+@app_commands.check(check_admin_role)
+@schedule_group.command(name="list", description="List the scheduled commands")
+async def schedule_list(interaction: discord.Interaction):
+    if not check_admin_role(interaction):
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
+        return
+
+    jobs = sorted(scheduler.jobs.values(), key=lambda job: job.next_run)
+    if not jobs:
+        await respond(interaction, "No scheduled commands.", ephemeral=True)
+        return
+    lines = []
+    for job in jobs:
+        status = "" if job.last_success is None else (" ✅" if job.last_success else " ❌")
+        lines.append(
+            f"**{job.id}.** `{truncate(job.command, 200)}` on {job.server}, {parse_schedule(job.schedule)}, "
+            f"next <t:{int(job.next_run)}:R>{status}"
+        )
+    await send_long_response(interaction, "Scheduled Commands", "\n".join(lines), discord.Color.blue(), filename="schedules.txt")
+
+@app_commands.check(check_admin_role)
+@schedule_group.command(name="remove", description="Remove a scheduled command")
+async def schedule_remove(interaction: discord.Interaction, job_id: int):
+    if not check_admin_role(interaction):
+        await respond(interaction, "You do not have the required role to use this command.", ephemeral=True)
+        return
+
+    if not scheduler.remove(job_id):
+        await respond(interaction, f"There is no job {job_id}.", ephemeral=True)
+        return
+    print(f"Schedule Command: Called by {interaction.user.name}. Removed job {job_id}")
+    await respond(interaction, embed=discord.Embed(title="Job Removed", description=f"Job {job_id} will not run again.", color=discord.Color.green()))
+
+stats_group = app_commands.Group(name="stats", description="Player and server statistics")
+
+@stats_group.command(name="playtime", description="How long a player has played")
+@app_commands.autocomplete(player=complete_player)
+async def playtime(interaction: discord.Interaction, player: str, server: Server = None):
+    seconds = await session_tracker.playtime(player, server)
+    if not seconds:
+        await respond(interaction, f"No playtime recorded for {player}.", ephemeral=True)
+        return
+
+    embed = discord.Embed(
+        title="Playtime",
+        description=f"**{player}** has played for **{format_duration(seconds)}**" + (f" on {server}" if server else ""),
+        color=discord.Color.blue()
+    )
+    await respond(interaction, embed=embed)
+
+@stats_group.command(name="seen", description="When a player was last online")
+@app_commands.autocomplete(player=complete_player)
+async def seen(interaction: discord.Interaction, player: str):
+    current = session_tracker.online(player)
+    if current is not None:
+        server_name, joined = current
+        description = f"**{player}** is online on {server_name} since <t:{int(joined)}:R>"
+    else:
+        last = await session_tracker.seen(player)
+        if last is None:
+            await respond(interaction, f"{player} has not been seen yet.", ephemeral=True)
+            return
+        server_name, name, left = last
+        description = f"**{name}** was last seen on {server_name} <t:{int(left)}:R>"
+
+    embed = discord.Embed(title="Last Seen", description=description, color=discord.Color.blue())
+    await respond(interaction, embed=embed)
+
+@stats_group.command(name="top", description="Players with the most playtime")
+@app_commands.describe(days="Only count the last few days")
+async def top(interaction: discord.Interaction, days: app_commands.Range[int, 1, 365] = None, server: Server = None):
+    rows = await session_tracker.top(10, server, days)
+    if not rows:
+        await respond(interaction, "No playtime recorded yet.", ephemeral=True)
+        return
+
+    lines = [f"**{index}.** {player} - {format_duration(seconds)}" for index, (player, seconds) in enumerate(rows, 1)]
+    title = "Top Players" + (f" ({days} days)" if days else "")
+    embed = discord.Embed(title=title, description="\n".join(lines), color=discord.Color.gold())
+    if server:
+        embed.set_footer(text=f"Server: {server}")
+    await respond(interaction, embed=embed)
+
+GRAPH_METRICS = {"players": "Players online", "ping": "Ping (ms)", "online": "Online"}
+GRAPH_PERIODS = {"1h": 3600, "24h": 86400, "7d": 7 * 86400, "30d": 30 * 86400, "1y": 365 * 86400}
+
+@stats_group.command(name="graph", description="Chart the server history")
+@app_commands.choices(
+    metric=[app_commands.Choice(name=label, value=name) for name, label in GRAPH_METRICS.items()],
+    period=[app_commands.Choice(name=name, value=name) for name in GRAPH_PERIODS]
+)
+async def graph(interaction: discord.Interaction, metric: str = "players", period: str = "24h", server: Server = None):
+    if Figure is None:
+        await respond(interaction, "Charts need matplotlib, install it with `pip install matplotlib`.", ephemeral=True)
+        return
+
+    server = server or DEFAULT_SERVER
+    tier, points = history.query(server, metric, GRAPH_PERIODS[period])
+    if len(points) < 2:
+        await respond(interaction, "Not enough history recorded yet.", ephemeral=True)
+        return
+
+    await defer(interaction)
+    title = f"{server} - {GRAPH_METRICS[metric]} ({period})"
+    image = await asyncio.to_thread(render_chart, title, GRAPH_METRICS[metric], points)
+    embed = discord.Embed(title=title, color=discord.Color.blue())
+    embed.set_image(url="attachment://graph.png")
+    embed.set_footer(text=f"{len(points)} points, {tier} resolution")
+    await respond(interaction, embed=embed, file=discord.File(io.BytesIO(image), filename="graph.png"))
+
 role_group = app_commands.Group(name="role", description="Add/Remove Admin Roles")
 
 @role_group.command(name="add", description="Add a role to the admin list")
 @app_commands.checks.has_permissions(moderate_members=True)
 async def add_role(interaction: discord.Interaction, role: discord.Role):
-    if role.id in ALLOWED_ROLE_ID:
-        await interaction.response.send_message(f"Role {role.name} is already an admin role.", ephemeral=True)
+    if not admin_roles.add(interaction.guild_id, role.id):
+        await respond(interaction, f"Role {role.name} is already an admin role.", ephemeral=True)
     else:
-        ALLOWED_ROLE_ID.append(role.id)
-        ave_admin_roles(ALLOWED_ROLE_ID)
-        await interaction.response.send_message(f"Role {role.name} has been added to the admin list.", ephemeral=True)
+        await respond(interaction, f"Role {role.name} has been added to the admin list.", ephemeral=True)
 
 @role_group.command(name="remove", description="Remove a role from the admin list")
 @app_commands.checks.has_permissions(moderate_members=True)
 async def remove_role(interaction: discord.Interaction, role: discord.Role):
-    if role.id in ALLOWED_ROLE_ID:
-        ALLOWED_ROLE_ID.remove(role.id)
-        save_admin_roles(ALLOWED_ROLE_ID)
-        await interaction.response.send_message(f"Role {role.name} has been removed from the admin list.", ephemeral=True)
+    if admin_roles.remove(interaction.guild_id, role.id):
+        await respond(interaction, f"Role {role.name} has been removed from the admin list.", ephemeral=True)
     else:
-        await interaction.response.send_message(f"Role {role.name} is not an admin role.", ephemeral=True)
+        await respond(interaction, f"Role {role.name} is not an admin role.", ephemeral=True)
 
 @role_group.command(name="view", description="View Admin Roles")
 async def view_roles(interaction: discord.Interaction):
     guild_roles = interaction.guild.roles
     
-    # Find roles matching the IDs in ALLOWED_ROLE_ID
-    roles_mentions = [f"<@&{role.id}>" for role in guild_roles if role.id in ALLOWED_ROLE_ID]
+    # Find roles matching the admin role IDs of this guild
+    allowed_role_ids = admin_roles.roles(interaction.guild_id)
+    roles_mentions = [f"<@&{role.id}>" for role in guild_roles if role.id in allowed_role_ids]
     embed = discord.Embed(
         title="Admin Roles",
         description="Roles managing minecraft server",
@@ -628,8 +1319,9 @@ async def view_roles(interaction: discord.Interaction):
     embed.set_footer(text="Requested by " + interaction.user.name)
     embed.set_thumbnail(url="https://i.ibb.co/QJhHc3d/Userbox-creeper-svg.png")
 
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await respond(interaction, embed=embed, ephemeral=True)
     
 bot.tree.add_command(server_group)
+bot.tree.add_command(stats_group)
 bot.tree.add_command(role_group)
 bot.run(DISCORD_TOKEN)
@@ -0,0 +1,85 @@
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops sending commands to a server that keeps failing.
+
+    After `failure_threshold` failures in a row the circuit opens and calls
+    fail right away. Once `reset_timeout` has passed it goes half open and
+    lets `probes` calls through: a success closes it again, a failure opens
+    it for another `reset_timeout`. Failed status polls count as failures,
+    and a poll that finds the server online lets a probe through right away.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30, probes: int = 1, on_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.on_change = on_change
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = 0
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            self.state = state
+            print(f"RCON circuit for {self.name} is now {state.replace('_', ' ')}.")
+            if self.on_change is not None:
+                self.on_change(self.name, state)
+
+    @property
+    def retry_after(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may go through now. Every allowed call must report success() or failure()."""
+        if self.state == OPEN:
+            if self.retry_after:
+                return False
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probing >= self.probes:
+                return False
+            self._probing += 1
+        return True
+
+    def success(self):
+        self.failures = 0
+        if self.state == HALF_OPEN:
+            self._probing = max(0, self._probing - 1)
+            self._set_state(CLOSED)
+
+    def failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self._probing = max(0, self._probing - 1)
+            self.open()
+        elif self.failures >= self.failure_threshold:
+            self.open()
+
+    def record(self, results):
+        """Count a round of RCON results, a failure if any of them could not reach the server."""
+        if any(result.error == "connection" for result in results):
+            self.failure()
+        else:
+            self.success()
+
+    def open(self):
+        self.opened_at = time.monotonic()
+        self._set_state(OPEN)
+
+    def report_status(self, online: bool):
+        """Feed in a status poll: offline counts as a failure, online ends the wait of an open circuit."""
+        if not online and self.state == CLOSED:
+            # A single slow status probe should not block RCON commands that still work
+            self.failure()
+        elif online and self.state == OPEN:
+            self.opened_at = time.monotonic() - self.reset_timeout
@@ -9,6 +9,40 @@ DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 RCON_PASSWORD = os.getenv("RCON_PASSWORD")
 RCON_PORT = int(os.getenv("RCON_PORT", 25575))
 RCON_HOST = os.getenv("RCON_HOST")
+RCON_POOL_SIZE = int(os.getenv("RCON_POOL_SIZE", 2))
+RCON_TIMEOUT = float(os.getenv("RCON_TIMEOUT", 5))
+RCON_MAX_IN_FLIGHT = int(os.getenv("RCON_MAX_IN_FLIGHT", 8))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 3))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30))
+AUTO_DEFER_AFTER = float(os.getenv("AUTO_DEFER_AFTER", 1.5))
+STATUS_CACHE_TTL = float(os.getenv("STATUS_CACHE_TTL", 30))
+STATUS_TIMEOUT = float(os.getenv("STATUS_TIMEOUT", 5))
+SRV_LOOKUP = os.getenv("SRV_LOOKUP", "false").lower() == "true"
+QUERY_ENABLED = os.getenv("QUERY_ENABLED", "false").lower() == "true"
+QUERY_PORT = int(os.getenv("QUERY_PORT", 0))
+STATUS_CONCURRENCY = int(os.getenv("STATUS_CONCURRENCY", 10))
+LIST_CACHE_TTL = float(os.getenv("LIST_CACHE_TTL", 5))
+BANLIST_CACHE_TTL = float(os.getenv("BANLIST_CACHE_TTL", 300))
+SEED_CACHE_TTL = float(os.getenv("SEED_CACHE_TTL", 86400))
+RESPONSE_FILE_THRESHOLD = int(os.getenv("RESPONSE_FILE_THRESHOLD", 20000))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+WATCHDOG_THRESHOLD = float(os.getenv("WATCHDOG_THRESHOLD", 0.25))
+WATCHDOG_DEBUG = os.getenv("WATCHDOG_DEBUG", "false").lower() == "true"
+SYNC_GUILD_ID = int(os.getenv("SYNC_GUILD_ID", 0))
+PRESENCE_INTERVAL = float(os.getenv("PRESENCE_INTERVAL", 60))
+PRESENCE_FAST_INTERVAL = float(os.getenv("PRESENCE_FAST_INTERVAL", 15))
+PRESENCE_MAX_INTERVAL = float(os.getenv("PRESENCE_MAX_INTERVAL", 600))
+PRESENCE_JITTER = float(os.getenv("PRESENCE_JITTER", 0.1))
+THROTTLE_RATE = float(os.getenv("THROTTLE_RATE", 0.2))
+THROTTLE_BURST = int(os.getenv("THROTTLE_BURST", 3))
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", 4))
+BULK_RETRIES = int(os.getenv("BULK_RETRIES", 2))
+SCHEDULE_CONCURRENCY = int(os.getenv("SCHEDULE_CONCURRENCY", 2))
+LOG_FILE = os.getenv("LOG_FILE", "")
+LOG_CHANNEL_ID = int(os.getenv("LOG_CHANNEL_ID", 0))
+LOG_RELAY_INTERVAL = float(os.getenv("LOG_RELAY_INTERVAL", 2))
+LOG_RELAY_EVENTS = os.getenv("LOG_RELAY_EVENTS", "chat,join,leave,death,advancement").split(",")
 
 #IP = ""
 #PORT = 25565
@@ -17,24 +51,65 @@ RCON_HOST = os.getenv("RCON_HOST")
 #RCON_PORT = 25575
 #RCON_HOST = ""
 
-ADMIN_ROLES_FILE = "admin_roles.json"
+SERVER_NAME = os.getenv("SERVER_NAME", "main")
+SERVERS_FILE = "servers.json"
 
-def load_admin_roles():
+def load_servers():
     try:
-        with open(ADMIN_ROLES_FILE, "r") as file:
+        with open(SERVERS_FILE, "r") as file:
             data = json.load(file)
-            return data["allowed_role_ids"]
     except FileNotFoundError:
-        print(f"{ADMIN_ROLES_FILE} not found. Creating a new one...")
-        default_data = {"allowed_role_ids": []}
-        save_admin_roles(default_data["allowed_role_ids"])
-        return default_data["allowed_role_ids"]
+        # Single server setup from the environment
+        data = {"servers": [{"name": SERVER_NAME}]}
     except json.JSONDecodeError:
-        print(f"Error reading {ADMIN_ROLES_FILE}. Check the file format.")
-        return []
+        print(f"Error reading {SERVERS_FILE}. Check the file format.")
+        data = {"servers": [{"name": SERVER_NAME}]}
+
+    servers = []
+    for server in data["servers"]:
+        servers.append({
+            "name": server["name"],
+            "ip": server.get("ip", IP),
+            "port": int(server.get("port", PORT)),
+            "rcon_host": server.get("rcon_host", server.get("ip", RCON_HOST)),
+            "rcon_port": int(server.get("rcon_port", RCON_PORT)),
+            "rcon_password": server.get("rcon_password", RCON_PASSWORD),
+            # query.port defaults to the game port in server.properties
+            "query_port": int(server.get("query_port", QUERY_PORT or server.get("port", PORT))) if QUERY_ENABLED else 0,
+        })
+    return servers
+
+SERVERS = load_servers()
+
+ADMIN_ROLES_FILE = "admin_roles.json"
+ADMIN_ROLES_RELOAD_INTERVAL = float(os.getenv("ADMIN_ROLES_RELOAD_INTERVAL", 10))
+COMMAND_SYNC_FILE = "command_sync.json"
+
+# Seconds to wait for the reply of slow commands, the rest use RCON_TIMEOUT
+RCON_COMMAND_TIMEOUTS = {
+    "save-all": 60,
+    "reload": 60,
+    "locate": 30,
+    "locatebiome": 30,
+    "fill": 30,
+    "forceload": 30,
+}
+
+# Per command (commands per second, burst), for commands that need a different
+# limit than THROTTLE_RATE and THROTTLE_BURST
+COMMAND_THROTTLES = {
+    "server status": (0.5, 3),
+    "server batch": (1 / 30, 1),
+    "server bulk": (1 / 60, 1),
+    "stats graph": (0.1, 2),
+}
+
+SESSIONS_DB = "sessions.db"
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", 10))
 
-def save_admin_roles(allowed_role_ids):
-    with open(ADMIN_ROLES_FILE, "w") as file:
-        json.dump({"allowed_role_ids": allowed_role_ids}, file, indent=4)
+TIMESERIES_FILE = "timeseries.json"
+TIMESERIES_SNAPSHOT_INTERVAL = float(os.getenv("TIMESERIES_SNAPSHOT_INTERVAL", 300))
 
-ALLOWED_ROLE_ID = load_admin_roles()
+LOG_OFFSET_FILE = "log_offset.json"
+SCHEDULES_FILE = "schedules.json"
+REGISTRY_FILE = "registry.json"
@@ -0,0 +1,168 @@
+import asyncio
+import collections
+import json
+import os
+import re
+from pagination import paginate
+
+READ_SIZE = 1 << 20
+
+# Vanilla "[12:34:56] [Server thread/INFO]: " and Paper "[12:34:56 INFO]: " prefixes
+LOG_LINE = re.compile(r"^\[[^\]]+(?:\] \[[^\]]+/| )INFO\]: (.*)$")
+
+# Checked in order against the message part of the line, first match wins
+EVENT_PATTERNS = (
+    ("chat", re.compile(r"^(?:\[Not Secure\] )?<([^>]+)> (.*)$")),
+    ("join", re.compile(r"^(\w{1,16}) joined the game$")),
+    ("leave", re.compile(r"^(\w{1,16}) left the game$")),
+    ("advancement", re.compile(r"^(\w{1,16}) has (?:made the advancement|completed the challenge|reached the goal) \[(.+)\]$")),
+    ("death", re.compile(
+        r"^(\w{1,16}) (?:was |died|drowned|fell|blew up|burned|hit the ground|went up in flames|walked into|"
+        r"tried to swim|suffocated|starved|froze|withered|experienced kinetic energy|discovered the floor|"
+        r"didn't want to live|left the confines|went off with a bang)(.*)$"
+    )),
+)
+
+
+def classify(line: str):
+    """The event kind and message of a log line, or None for lines that are not relayed."""
+    match = LOG_LINE.match(line)
+    if not match:
+        return None
+    message = match.group(1)
+    for kind, pattern in EVENT_PATTERNS:
+        if pattern.match(message):
+            return kind, message
+    return None
+
+
+class LogFollower:
+    """Follows a log file like `tail -F`, polling with os.stat.
+
+    Keeps the file open, so lines written just before a rotation are still
+    read from the old file before switching to the new one. The position is
+    saved to `offset_path` and picked up again after a restart.
+    """
+
+    def __init__(self, path: str, offset_path: str, poll_interval: float = 1.0):
+        self.path = path
+        self.offset_path = offset_path
+        self.poll_interval = poll_interval
+        self._file = None
+        self._inode = None
+        self._partial = b""
+        self._saved = None
+
+    def _open(self):
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._partial = b""
+        try:
+            with open(self.offset_path, "r") as file:
+                saved = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            saved = None
+        if saved is None:
+            # First start, skip what is already in the log
+            self._file.seek(0, os.SEEK_END)
+        elif saved["inode"] == self._inode and saved["offset"] <= os.fstat(self._file.fileno()).st_size:
+            self._file.seek(saved["offset"])
+
+    def _rotated(self) -> bool:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return stat.st_ino != self._inode or stat.st_size < self._file.tell()
+
+    def _read(self) -> list:
+        if self._file is None:
+            self._open()
+            if self._file is None:
+                return []
+        data = self._file.read(READ_SIZE)
+        if not data:
+            if self._rotated():
+                # Everything in the old file has been read, continue in the new one
+                self._file.close()
+                self._file = open(self.path, "rb")
+                self._inode = os.fstat(self._file.fileno()).st_ino
+                self._partial = b""
+            return []
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        return [line.decode("utf8", errors="replace").rstrip("\r") for line in lines]
+
+    def _save(self):
+        offset = {"inode": self._inode, "offset": self._file.tell() - len(self._partial)}
+        if offset != self._saved:
+            with open(self.offset_path, "w") as file:
+                json.dump(offset, file)
+            self._saved = offset
+
+    async def follow(self):
+        """Yield lists of new lines as they are written."""
+        while True:
+            lines = await asyncio.to_thread(self._read)
+            if lines:
+                yield lines
+                await asyncio.to_thread(self._save)
+            else:
+                await asyncio.sleep(self.poll_interval)
+
+
+class LogRelay:
+    """Coalesces relayed lines into as few channel messages as possible.
+
+    Lines are collected for `interval` seconds and sent as messages of up to
+    2000 characters, at most `max_messages` per interval. That stays under
+    Discord's per channel limit of 5 messages in 5 seconds. When the backlog
+    grows past `max_lines`, the oldest lines are dropped and counted.
+    """
+
+    def __init__(self, send, interval: float = 2.0, max_messages: int = 2, max_lines: int = 1000):
+        self.send = send
+        self.interval = interval
+        self.max_messages = max_messages
+        self._lines = collections.deque(maxlen=max_lines)
+        self.dropped = 0
+        self.sent = 0
+
+    def add(self, text: str):
+        if len(self._lines) == self._lines.maxlen:
+            self.dropped += 1
+        self._lines.append(text)
+
+    def _take(self, current: str = "") -> list:
+        pages = []
+        while self._lines and len(pages) < self.max_messages:
+            line = self._lines[0]
+            if current and len(current) + len(line) + 1 > 2000:
+                pages.append(current)
+                current = ""
+                continue
+            self._lines.popleft()
+            if len(line) > 2000:
+                pages.extend(paginate(line, 2000))
+                continue
+            current = f"{current}\n{line}" if current else line
+        if current:
+            pages.append(current)
+        return pages
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            note = ""
+            if self.dropped:
+                note = f"*{self.dropped} lines skipped, the relay fell behind*"
+                self.dropped = 0
+            for page in self._take(note):
+                try:
+                    await self.send(page)
+                    self.sent += 1
+                except Exception as error:
+                    print(f"Error relaying log lines: {error}")
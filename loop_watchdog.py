@@ -0,0 +1,88 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+
+class LoopWatchdog:
+    """Measures event loop lag and reports whatever is blocking the loop.
+
+    A heartbeat task runs on the loop every `interval` seconds and records how
+    late it woke up. A separate thread watches the heartbeat, and when it is
+    more than `threshold` seconds overdue it prints the current task and the
+    stack of the loop thread while the blocking call is still running.
+    """
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1, lag_histogram=None, stall_counter=None):
+        self.threshold = threshold
+        self.interval = interval
+        self.lag_histogram = lag_histogram
+        self.stall_counter = stall_counter
+        self._loop = None
+        self._loop_thread = None
+        self._last_beat = time.monotonic()
+        self._beats = 0
+        self._reported_beat = -1
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            self._beats += 1
+            if self.lag_histogram is not None:
+                self.lag_histogram.observe(max(now - expected, 0))
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled < self.threshold or self._reported_beat == self._beats:
+                continue
+            self._reported_beat = self._beats
+            if self.stall_counter is not None:
+                self.stall_counter.inc()
+
+            task = asyncio.current_task(self._loop)
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            name = task.get_coro().__qualname__ if task is not None else "a callback"
+            print(f"Event loop blocked for {stalled:.3f}s+ by {name}:\n{stack}")
+
+
+def enable_blocking_io_debug(threshold: float = 0.25):
+    """Fail loudly when blocking socket I/O runs on the event loop thread.
+
+    Also turns on asyncio debug mode, which logs every callback running longer
+    than `threshold`. Meant for development, audit hooks cannot be removed.
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = threshold
+    loop_thread = threading.get_ident()
+
+    def audit(event, args):
+        if threading.get_ident() != loop_thread:
+            return
+        if event == "socket.connect" and args[0].gettimeout() != 0.0:
+            raise RuntimeError(f"Blocking socket.connect to {args[1]} on the event loop thread")
+        if event in ("socket.getaddrinfo", "socket.gethostbyname", "socket.gethostbyaddr"):
+            raise RuntimeError(f"Blocking DNS lookup {event} {args[0]} on the event loop thread")
+
+    sys.addaudithook(audit)
@@ -0,0 +1,98 @@
+import asyncio
+import csv
+import io
+import re
+import time
+
+PLAYER_NAME = re.compile(r"^\w{1,16}$")
+
+# How each bulk action is sent over RCON
+ACTIONS = {
+    "ban": "ban {player} {reason}",
+    "unban": "pardon {player}",
+    "kick": "kick {player} {reason}",
+    "whitelist_add": "whitelist add {player}",
+    "whitelist_remove": "whitelist remove {player}",
+}
+
+
+def parse_targets(lines, default_reason: str) -> tuple:
+    """Split "name [reason]" lines into (player, reason) pairs and the lines that are not valid names."""
+    targets = []
+    invalid = []
+    seen = set()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        player, _, reason = line.partition(" ")
+        if not PLAYER_NAME.match(player):
+            invalid.append(line)
+            continue
+        if player.lower() in seen:
+            continue
+        seen.add(player.lower())
+        targets.append((player, reason.strip() or default_reason))
+    return targets, invalid
+
+
+class BulkRun:
+    """Runs one moderation action for many players with bounded concurrency.
+
+    `send(command)` returns an RconResult. Connection errors are retried with
+    a growing delay, any other failure is final. `on_progress` is called after
+    every finished player and is expected to rate limit itself.
+    """
+
+    def __init__(self, action: str, targets: list, send, concurrency: int = 4, retries: int = 2, on_progress=None, skipped=()):
+        self.action = action
+        self.targets = targets
+        self.skipped = list(skipped)
+        self.send = send
+        self.concurrency = concurrency
+        self.retries = retries
+        self.on_progress = on_progress
+        self.results = []
+        self.failed = 0
+        self.elapsed = 0.0
+
+    async def _run_one(self, semaphore: asyncio.Semaphore, player: str, reason: str):
+        command = ACTIONS[self.action].format(player=player, reason=reason).strip()
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                result = await self.send(command)
+                if result.success or result.error not in ("connection", "not_sent"):
+                    break
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        if not result.success:
+            self.failed += 1
+        self.results.append((player, reason, result.success, attempt + 1, result.text))
+        if self.on_progress is not None:
+            try:
+                await self.on_progress(self)
+            except Exception as error:
+                # A failed progress update must not abort the run and lose the report
+                print(f"Error reporting bulk progress: {error}")
+
+    async def run(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        await asyncio.gather(*(self._run_one(semaphore, player, reason) for player, reason in self.targets))
+        self.elapsed = time.perf_counter() - started
+        return self.results
+
+    @property
+    def done(self) -> int:
+        return len(self.results)
+
+    def report(self) -> bytes:
+        """Per player results as CSV, in the order the players were given, then the skipped lines."""
+        order = {player: index for index, (player, _) in enumerate(self.targets)}
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["player", "action", "reason", "success", "attempts", "response"])
+        for player, reason, success, attempts, text in sorted(self.results, key=lambda row: order[row[0]]):
+            writer.writerow([player, self.action, reason, success, attempts, text])
+        for line in self.skipped:
+            writer.writerow([line, self.action, "", False, 0, "Not a valid player name"])
+        return buffer.getvalue().encode("utf8")
@@ -0,0 +1,157 @@
+import asyncio
+import itertools
+import time
+import discord
+
+# Queue priorities, lower runs first. Interaction responses skip the queue.
+NOTIFICATION = 0
+PRESENCE = 1
+
+# (requests, seconds) allowed per route, a little under what Discord enforces
+ROUTE_LIMITS = {
+    "channel": (5, 5),
+    "presence": (5, 60),
+    "message": (5, 5),
+}
+MAX_EMBEDS = 10
+
+
+class RouteBucket:
+    """Token bucket for one route. A 429 empties it until Discord's retry_after has passed."""
+
+    def __init__(self, requests: int, seconds: float):
+        self.capacity = requests
+        self.rate = requests / seconds
+        self.tokens = float(requests)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def block(self, seconds: float):
+        self.tokens = 0.0
+        self.blocked_until = time.monotonic() + seconds
+
+
+class Dispatcher:
+    """Sends everything the bot posts to Discord in priority order.
+
+    Interaction responses are sent right away and hold back all queued
+    traffic until they are done, so background work never eats into the
+    3 second acknowledgement window. Queued sends wait for their route's
+    bucket. Embeds for the same channel are merged into messages of up to
+    10 embeds while they wait, and a queued update with `replace` is
+    overwritten by a newer one instead of sending both.
+    """
+
+    def __init__(self, limits: dict = ROUTE_LIMITS):
+        self.limits = limits
+        self._queue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        self._buckets = {}
+        self._replaceable = {}
+        self._embeds = {}
+        self._interactive = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._worker = None
+        self.sent = 0
+        self.rate_limited = 0
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    def _bucket(self, route: str) -> RouteBucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            bucket = self._buckets[route] = RouteBucket(*self.limits[route.split(":", 1)[0]])
+        return bucket
+
+    async def interactive(self, send):
+        """Run an interaction response now, ahead of everything queued."""
+        self._interactive += 1
+        self._idle.clear()
+        try:
+            return await send()
+        finally:
+            self._interactive -= 1
+            if not self._interactive:
+                self._idle.set()
+
+    def submit(self, route: str, priority: int, send, replace: bool = False) -> asyncio.Future:
+        """Queue `send()` on `route`. The future resolves with its result once it was sent."""
+        if replace and route in self._replaceable:
+            # Still waiting, the newer update wins
+            entry = self._replaceable[route]
+            entry[1] = send
+            return entry[0]
+        future = asyncio.get_running_loop().create_future()
+        # Callers that do not wait for the result should not trigger "exception never retrieved"
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        entry = [future, send]
+        if replace:
+            self._replaceable[route] = entry
+        self._queue.put_nowait((priority, next(self._order), route, entry))
+        return future
+
+    def notify(self, channel, embed: discord.Embed) -> asyncio.Future:
+        """Post an embed to a channel, merged with other embeds waiting for the same channel."""
+        pending = self._embeds.get(channel.id)
+        if pending is not None:
+            pending[1].append(embed)
+            return pending[0]
+        embeds = [embed]
+
+        async def send():
+            # Embeds beyond the first message go out with the next one
+            del self._embeds[channel.id]
+            batch, rest = embeds[:MAX_EMBEDS], embeds[MAX_EMBEDS:]
+            for extra in rest:
+                self.notify(channel, extra)
+            return await channel.send(embeds=batch)
+
+        future = self.submit(f"channel:{channel.id}", NOTIFICATION, send)
+        self._embeds[channel.id] = (future, embeds)
+        return future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            await self._idle.wait()
+            priority, order, route, entry = item
+            bucket = self._bucket(route)
+            delay = bucket.delay()
+            if delay:
+                # Put it back once the route has room, other routes keep going
+                loop.call_later(delay, self._queue.put_nowait, item)
+                continue
+            if self._replaceable.get(route) is entry:
+                del self._replaceable[route]
+            bucket.take()
+            future, send = entry
+            try:
+                result = await send()
+            except Exception as error:
+                if isinstance(error, discord.HTTPException) and error.status == 429:
+                    self.rate_limited += 1
+                    bucket.block(getattr(error, "retry_after", 5.0))
+                print(f"Error sending to {route}: {error}")
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                self.sent += 1
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,56 @@
+import discord
+
+# Discord caps embed descriptions at 4096 characters
+PAGE_SIZE = 4000
+
+
+def paginate(text: str, size: int = PAGE_SIZE) -> list:
+    """Split text into pages of at most `size` characters, on line breaks where possible."""
+    pages = []
+    current = ""
+    for line in text.splitlines() or [""]:
+        while len(line) > size:
+            if current:
+                pages.append(current)
+                current = ""
+            pages.append(line[:size])
+            line = line[size:]
+        if current and len(current) + len(line) + 1 > size:
+            pages.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    pages.append(current)
+    return pages
+
+
+class PaginatorView(discord.ui.View):
+    """Previous/next buttons for browsing a long response one embed at a time."""
+
+    def __init__(self, title: str, pages: list, color: discord.Color, author_id: int, timeout: float = 300):
+        super().__init__(timeout=timeout)
+        self.title = title
+        self.pages = pages
+        self.color = color
+        self.author_id = author_id
+        self.index = 0
+
+    def embed(self) -> discord.Embed:
+        embed = discord.Embed(title=self.title, description=self.pages[self.index], color=self.color)
+        embed.set_footer(text=f"Page {self.index + 1}/{len(self.pages)}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Only the user who ran the command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = (self.index - 1) % len(self.pages)
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = (self.index + 1) % len(self.pages)
+        await interaction.response.edit_message(embed=self.embed(), view=self)
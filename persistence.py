@@ -0,0 +1,44 @@
+import asyncio
+import json
+import os
+
+
+def write_json(path: str, data, indent: int = None):
+    """Write `data` to `path` atomically, a crash leaves either the old or the new file."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(data, file, indent=indent)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class DebouncedSave:
+    """Writes `serialize()` behind, at most once per `delay` seconds and off the event loop.
+
+    `write(data)` defaults to an atomic JSON write of `path`.
+    """
+
+    def __init__(self, path: str, serialize, delay: float = 1.0, write=None):
+        self.path = path
+        self.serialize = serialize
+        self.delay = delay
+        self.write = write or (lambda data: write_json(path, data, indent=4))
+        self._task = None
+
+    @property
+    def pending(self) -> bool:
+        return self._task is not None
+
+    def schedule(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self):
+        # Collect a burst of changes into a single write
+        await asyncio.sleep(self.delay)
+        self._task = None
+        try:
+            await asyncio.to_thread(self.write, self.serialize())
+        except Exception as error:
+            print(f"Error saving {self.path}: {error}")
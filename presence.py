@@ -0,0 +1,52 @@
+import random
+
+
+class PresenceScheduler:
+    """Decides when to poll the servers again and whether the presence needs updating.
+
+    Polls faster while the player count is moving, backs off exponentially
+    while every server is offline and skips presence updates whose text has
+    not changed since the last one that was sent.
+    """
+
+    def __init__(self, interval: float = 60, fast_interval: float = 15, max_interval: float = 600, jitter: float = 0.1):
+        self.interval = interval
+        self.fast_interval = fast_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.sent = 0
+        self.skipped = 0
+        self._last_text = None
+        self._last_players = None
+        self._offline_polls = 0
+
+    @property
+    def max_age(self) -> float:
+        """How old a status result a poll may use. Short enough that no poll sees the previous poll's result."""
+        return self.fast_interval * (1 - self.jitter) / 2
+
+    def should_update(self, text: str) -> bool:
+        if text == self._last_text:
+            self.skipped += 1
+            return False
+        return True
+
+    def updated(self, text: str):
+        self._last_text = text
+        self.sent += 1
+
+    def next_interval(self, players, servers: int = 1) -> float:
+        """Seconds until the next poll. `players` is None when every server is offline."""
+        if players is None:
+            self._offline_polls += 1
+            interval = min(self.interval * 2 ** (self._offline_polls - 1), self.max_interval)
+        else:
+            self._offline_polls = 0
+            changed = self._last_players is not None and players != self._last_players
+            interval = self.fast_interval if changed else self.interval
+        self._last_players = players
+
+        # Spread the probes out so a whole fleet is not hit in lockstep
+        if servers > 1 and self.jitter:
+            interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return interval
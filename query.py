@@ -0,0 +1,145 @@
+import asyncio
+import itertools
+import socket
+import struct
+import time
+
+MAGIC = b"\xfe\xfd"
+HANDSHAKE = 9
+STAT = 0
+# Constant padding around the key/value section and the player list of a full stat reply
+KEYS_PADDING = b"splitnum\x00\x80\x00"
+PLAYERS_PADDING = b"\x01player_\x00\x00"
+
+
+class QueryError(Exception):
+    pass
+
+
+def _parse_full_stat(payload: bytes) -> dict:
+    if not payload.startswith(KEYS_PADDING):
+        raise QueryError("Unexpected full stat reply")
+    keys, _, players = payload[len(KEYS_PADDING):].partition(PLAYERS_PADDING)
+    fields = keys.split(b"\x00")
+    values = {}
+    for key, value in zip(fields[0::2], fields[1::2]):
+        if not key:
+            break
+        values[key.decode("latin-1")] = value.decode("utf8", errors="replace")
+    names = [name.decode("utf8", errors="replace") for name in players.split(b"\x00") if name]
+
+    # "plugins" is "Paper on 1.20.4: Plugin 1.0; Other 2.1" or empty on vanilla
+    software, _, plugin_list = values.get("plugins", "").partition(": ")
+    return {
+        "motd": values.get("hostname", ""),
+        "version": values.get("version", ""),
+        "software": software or "vanilla",
+        "plugins": [plugin.strip() for plugin in plugin_list.split(";") if plugin.strip()],
+        "map": values.get("map", ""),
+        "players_online": int(values.get("numplayers", len(names))),
+        "max_players": int(values.get("maxplayers", 0)),
+        "player_names": names,
+    }
+
+
+def _session_id(counter: int) -> bytes:
+    # Other implementations mask the session ID with 0x0F0F0F0F, so the
+    # counter is spread over the low nibbles. That gives 65536 IDs before one
+    # repeats.
+    return bytes((counter >> shift) & 0x0F for shift in (12, 8, 4, 0))
+
+
+class QueryClient(asyncio.DatagramProtocol):
+    """Minecraft UDP Query (GameSpy 4) full stat requests over one shared socket.
+
+    Replies are matched to requests by address and session ID. The server
+    keeps one challenge per client address and answers stat requests with the
+    session ID of the handshake that issued it, so the session is stored with
+    the token and concurrent queries of one server share a single request.
+    Challenge tokens are kept for `token_ttl` seconds, the server rotates them
+    every 30, so most queries are a single round trip. A request that goes
+    unanswered with a cached token is retried once with a fresh one.
+    """
+
+    def __init__(self, token_ttl: float = 25.0):
+        self.token_ttl = token_ttl
+        self._transport = None
+        self._pending = {}
+        self._tokens = {}
+        self._in_flight = {}
+        self._sessions = itertools.count(1)
+        self._lock = asyncio.Lock()
+
+    def datagram_received(self, data: bytes, addr):
+        if len(data) < 5:
+            return
+        future = self._pending.pop((addr, data[0], data[1:5]), None)
+        if future is not None and not future.done():
+            future.set_result(data[5:])
+
+    def error_received(self, error: Exception):
+        # ICMP port unreachable and the like, requests time out on their own
+        pass
+
+    async def _ensure_transport(self):
+        async with self._lock:
+            if self._transport is None or self._transport.is_closing():
+                self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                    lambda: self, local_addr=("0.0.0.0", 0)
+                )
+
+    async def _request(self, host: str, port: int, packet_type: int, session: bytes, payload: bytes, timeout: float) -> bytes:
+        await self._ensure_transport()
+        loop = asyncio.get_running_loop()
+        # Replies come from the IP address, so match them against that rather than a host name
+        addr = (await loop.getaddrinfo(host, port, family=socket.AF_INET, type=socket.SOCK_DGRAM))[0][4]
+        key = (addr, packet_type, session)
+        future = loop.create_future()
+        self._pending[key] = future
+        try:
+            self._transport.sendto(MAGIC + bytes([packet_type]) + session + payload, addr)
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(key, None)
+
+    async def _token(self, host: str, port: int, timeout: float):
+        """Return the challenge token and the session ID of the handshake that issued it."""
+        cached = self._tokens.get((host, port))
+        if cached is not None and cached[2] > time.monotonic():
+            return cached[0], cached[1]
+        session = _session_id(next(self._sessions))
+        reply = await self._request(host, port, HANDSHAKE, session, b"", timeout)
+        token = struct.pack(">i", int(reply.rstrip(b"\x00")))
+        self._tokens[(host, port)] = (token, session, time.monotonic() + self.token_ttl)
+        return token, session
+
+    async def _full_stat(self, host: str, port: int, timeout: float) -> dict:
+        cached = (host, port) in self._tokens and self._tokens[(host, port)][2] > time.monotonic()
+        token, session = await self._token(host, port, timeout)
+        try:
+            reply = await self._request(host, port, STAT, session, token + b"\x00\x00\x00\x00", timeout)
+        except asyncio.TimeoutError:
+            if not cached:
+                raise
+            # The server may have rotated the token early, get a new one
+            self._tokens.pop((host, port), None)
+            token, session = await self._token(host, port, timeout)
+            reply = await self._request(host, port, STAT, session, token + b"\x00\x00\x00\x00", timeout)
+        return _parse_full_stat(reply)
+
+    async def full_stat(self, host: str, port: int, timeout: float = 3.0) -> dict:
+        """Read the full stat. `timeout` applies to each request, up to 3 are sent.
+
+        Calls for a server that is already being queried wait for that query.
+        """
+        task = self._in_flight.get((host, port))
+        if task is None:
+            task = asyncio.ensure_future(self._full_stat(host, port, timeout))
+            self._in_flight[(host, port)] = task
+            task.add_done_callback(lambda _: self._in_flight.pop((host, port), None))
+        # One caller giving up must not cancel the query for the others
+        return await asyncio.shield(task)
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
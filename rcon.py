@@ -0,0 +1,267 @@
+import asyncio
+import collections
+import itertools
+import struct
+
+# Source RCON packet types, as used by the Minecraft server
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+# Vanilla servers split replies into packets of 4096 characters
+RCON_MAX_PAYLOAD = 4096
+
+
+class RconError(Exception):
+    pass
+
+
+class RconAuthError(RconError):
+    pass
+
+
+class RconNotSentError(RconError, ConnectionError):
+    """The connection closed before the command was sent, so it never ran."""
+
+
+def encode_packet(request_id: int, packet_type: int, payload: str) -> bytes:
+    body = struct.pack("<ii", request_id, packet_type) + payload.encode("utf8") + b"\x00\x00"
+    return struct.pack("<i", len(body)) + body
+
+
+async def read_raw_packet(reader: asyncio.StreamReader):
+    (length,) = struct.unpack("<i", await reader.readexactly(4))
+    body = await reader.readexactly(length)
+    request_id, packet_type = struct.unpack("<ii", body[:8])
+    return request_id, packet_type, body[8:-2]
+
+
+async def read_packet(reader: asyncio.StreamReader):
+    request_id, packet_type, payload = await read_raw_packet(reader)
+    return request_id, packet_type, payload.decode("utf8", errors="replace")
+
+
+class RconConnection:
+    """A single authenticated RCON connection.
+
+    Several commands can be in flight at once. Every request carries its own
+    request ID and a background reader task matches replies back to the caller.
+    Vanilla servers read a single packet per socket read and drop the
+    connection when two arrive together, so only one packet is on the wire at
+    a time. The rest wait in an outbox until the previous one is answered.
+
+    Replies longer than 4096 characters arrive split over several packets
+    with no marker for the last one. A shorter first part is the whole reply.
+    After a full size first part, an empty packet of an invalid type is sent.
+    The server answers it only after the whole reply has been sent, so its
+    answer marks the end of the reply.
+    """
+
+    def __init__(self, host: str, port: int, password: str, timeout: float = 5.0, max_in_flight: int = 8):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._sentinels = {}
+        self._outbox = collections.deque()
+        self._on_wire = None
+        self._timeouts = {}
+        self._timers = {}
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    @property
+    def closed(self) -> bool:
+        return self._writer is None or self._writer.is_closing()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        try:
+            await asyncio.wait_for(self._authenticate(), self.timeout)
+        except BaseException:
+            self.close()
+            raise
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def _authenticate(self):
+        request_id = next(self._ids)
+        self._writer.write(encode_packet(request_id, SERVERDATA_AUTH, self.password))
+        await self._writer.drain()
+        while True:
+            response_id, packet_type, _ = await read_packet(self._reader)
+            # Some servers send an empty RESPONSE_VALUE before the auth response
+            if packet_type != SERVERDATA_AUTH_RESPONSE:
+                continue
+            if response_id == -1:
+                raise RconAuthError("Login failed")
+            return
+
+    async def _read_loop(self):
+        try:
+            while True:
+                response_id, _, payload = await read_raw_packet(self._reader)
+                if response_id == self._on_wire:
+                    self._on_wire = None
+                if response_id in self._sentinels:
+                    self._complete(self._sentinels.pop(response_id))
+                elif response_id in self._pending:
+                    fragments = self._pending[response_id][1]
+                    fragments.append(payload)
+                    if len(fragments) == 1 and len(payload) < RCON_MAX_PAYLOAD:
+                        self._complete(response_id)
+                    elif len(fragments) == 1:
+                        # More parts may follow, ask for the end marker next
+                        sentinel_id = next(self._ids)
+                        self._sentinels[sentinel_id] = response_id
+                        self._outbox.appendleft((sentinel_id, encode_packet(sentinel_id, SERVERDATA_RESPONSE_VALUE, "")))
+                self._flush()
+        except Exception as error:
+            self._fail_pending(error)
+        finally:
+            self.close()
+
+    def _complete(self, request_id: int):
+        future, fragments = self._pending.pop(request_id)
+        timer = self._timers.pop(request_id, None)
+        if timer is not None:
+            timer.cancel()
+        if not future.done():
+            future.set_result(b"".join(fragments).decode("utf8", errors="replace"))
+
+    def _fail_pending(self, error: Exception):
+        if isinstance(error, asyncio.IncompleteReadError):
+            error = ConnectionResetError("RCON connection closed by the server")
+        for request_id, (future, _) in self._pending.items():
+            if future.done():
+                continue
+            if request_id in self._timers:
+                future.set_exception(error)
+            else:
+                future.set_exception(RconNotSentError("Not sent, the RCON connection closed first"))
+        for timer in self._timers.values():
+            timer.cancel()
+        self._pending.clear()
+        self._sentinels.clear()
+        self._outbox.clear()
+        self._timeouts.clear()
+        self._timers.clear()
+        self._on_wire = None
+
+    def _flush(self):
+        if self._on_wire is None and self._outbox and not self.closed:
+            self._on_wire, data = self._outbox.popleft()
+            self._writer.write(data)
+            timeout = self._timeouts.pop(self._on_wire, None)
+            if timeout is not None:
+                # Time spent waiting in the outbox does not count
+                self._timers[self._on_wire] = asyncio.get_running_loop().call_later(timeout, self._expire, self._on_wire)
+
+    def _expire(self, request_id: int):
+        future, _ = self._pending[request_id]
+        if not future.done():
+            future.set_exception(asyncio.TimeoutError())
+        # Nothing else can be sent until the server answers, which it may
+        # never do. Close, so queued commands fail as not sent and the pool
+        # does not pick a stuck connection.
+        self.close()
+
+    def _submit(self, command: str, timeout: float) -> asyncio.Future:
+        if self.closed:
+            raise RconNotSentError("Not sent, the RCON connection is closed")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (future, [])
+        self._timeouts[request_id] = timeout
+        self._outbox.append((request_id, encode_packet(request_id, SERVERDATA_EXECCOMMAND, command)))
+        self._flush()
+        return future
+
+    async def command(self, command: str, timeout: float = None) -> str:
+        """Run a command. `timeout` counts from when the command is sent, not while it is queued."""
+        async with self._in_flight:
+            future = self._submit(command, timeout or self.timeout)
+            if not self.closed:
+                await self._writer.drain()
+            return await future
+
+    async def pipeline(self, commands: list, timeouts: list = None) -> list:
+        """Queue all commands at once and collect the replies in order.
+
+        Commands run one after another, in order. Every command takes a slot
+        of `max_in_flight` and has its own timeout from `timeouts`. Failed
+        commands are returned as exceptions instead of raising, commands that
+        never ran as RconNotSentError.
+        """
+        timeouts = timeouts or [None] * len(commands)
+        return await asyncio.gather(
+            *(self.command(command, timeout) for command, timeout in zip(commands, timeouts)),
+            return_exceptions=True,
+        )
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        if self._reader_task is not None and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+        self._fail_pending(ConnectionResetError("RCON connection closed"))
+
+
+class RconPool:
+    """A small pool of RCON connections that are kept open between commands.
+
+    Connections are opened lazily, up to `size`, and commands go to the least
+    busy one. A connection that has been dropped by the server is reconnected
+    and re-authenticated before the command is retried.
+    """
+
+    def __init__(self, host: str, port: int, password: str, size: int = 2, timeout: float = 5.0, max_in_flight: int = 8):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.size = size
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self._connections = []
+        self._lock = asyncio.Lock()
+
+    async def _acquire(self) -> RconConnection:
+        async with self._lock:
+            self._connections = [c for c in self._connections if not c.closed]
+            if self._connections:
+                connection = min(self._connections, key=lambda c: c.pending)
+                if connection.pending == 0 or len(self._connections) >= self.size:
+                    return connection
+            connection = RconConnection(self.host, self.port, self.password, self.timeout, self.max_in_flight)
+            await connection.connect()
+            self._connections.append(connection)
+            return connection
+
+    async def command(self, command: str, timeout: float = None) -> str:
+        connection = await self._acquire()
+        try:
+            return await connection.command(command, timeout)
+        except ConnectionError:
+            # The server closed an idle connection, reconnect and retry once
+            connection.close()
+            connection = await self._acquire()
+            return await connection.command(command, timeout)
+
+    async def pipeline(self, commands: list, timeouts: list = None) -> list:
+        """Run several commands back to back on a single connection."""
+        connection = await self._acquire()
+        return await connection.pipeline(commands, timeouts)
+
+    def close(self):
+        while self._connections:
+            self._connections.pop().close()
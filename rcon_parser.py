@@ -0,0 +1,167 @@
+import re
+from dataclasses import dataclass, field
+
+COLOR_CODES = re.compile(r"§[0-9a-fk-orA-FK-OR]")
+
+# Checked in order against every response, first match wins
+ERROR_PATTERNS = (
+    ("unreachable", re.compile(r"^Command error: Server unreachable")),
+    ("not_sent", re.compile(r"^Command error: Not sent")),
+    ("connection", re.compile(r"^Command error:")),
+    ("syntax", re.compile(r"<--\[HERE\]$")),
+    ("syntax", re.compile(r"^(?:Unknown or incomplete command|Incorrect argument for command|Unknown command)")),
+    ("not_found", re.compile(r"^No (?:player|entity|targets?) (?:was|were) found|was found$|^That player does not exist")),
+    ("unknown_id", re.compile(r"^Unknown (?:item|entity|effect|advancement|structure|biome|block|dimension|criterion)")),
+    ("not_found", re.compile(r"^Could not find ")),
+    ("no_change", re.compile(r"^Nothing changed")),
+    ("permission", re.compile(r"^(?:You do not have permission|I'm sorry, but you do not have permission)")),
+    ("invalid", re.compile(r"^(?:Invalid|Expected|Can't|Cannot|Unable to) ")),
+)
+
+# Server commands of vanilla Java Edition, anything else is reported as "other" in metrics
+VANILLA_COMMANDS = frozenset((
+    "advancement", "attribute", "ban", "ban-ip", "banlist", "bossbar", "clear", "clone", "damage", "data",
+    "datapack", "debug", "defaultgamemode", "deop", "difficulty", "effect", "enchant", "execute", "experience",
+    "fill", "fillbiome", "forceload", "function", "gamemode", "gamerule", "give", "help", "item", "jfr", "kick",
+    "kill", "list", "locate", "locatebiome", "loot", "me", "msg", "op", "pardon", "pardon-ip", "particle",
+    "perf", "place", "playsound", "recipe", "reload", "ride", "save-all", "save-off", "save-on", "say",
+    "schedule", "scoreboard", "seed", "setblock", "setidletimeout", "setworldspawn", "spawnpoint",
+    "spectate", "spreadplayers", "stop", "stopsound", "summon", "tag", "team", "teammsg", "teleport", "tell",
+    "tellraw", "tick", "time", "title", "tm", "tp", "transfer", "trigger", "w", "weather", "whitelist",
+    "worldborder", "xp",
+))
+
+# Newest vanilla wording first
+LIST_PATTERNS = (
+    re.compile(r"^There are (\d+) of a max of (\d+) players online:\s*(.*)$", re.S),
+    re.compile(r"^There are (\d+)/(\d+) players online:\s*(.*)$", re.S),
+)
+BANLIST_PATTERNS = (
+    re.compile(r"^There (?:are|is) (\d+) bans?(?:\(s\))?:\s*(.*)$", re.S),
+    re.compile(r"^There are (\d+) total banned (?:players|IP addresses):\s*(.*)$", re.S),
+)
+BANLIST_EMPTY = re.compile(r"^There are no bans")
+BAN_ENTRY = re.compile(r"(\S+) was banned by (.+?): ")
+SEED_PATTERNS = (
+    re.compile(r"^Seed: \[(-?\d+)\]"),
+    re.compile(r"^Seed: (-?\d+)"),
+)
+LOCATE_PATTERNS = (
+    re.compile(r"is at \[(-?\d+), (~|-?\d+), (-?\d+)\](?: \((\d+) blocks away\))?"),
+    re.compile(r"^Located \S+ at (-?\d+) \(y\?\) (-?\d+)"),
+)
+
+
+@dataclass
+class RconResult:
+    """A parsed RCON response. `text` is the response without color codes."""
+
+    command: str
+    text: str
+    success: bool = True
+    error: str = None
+    players: list = field(default_factory=list)
+    entries: list = field(default_factory=list)
+    count: int = None
+    max: int = None
+    seed: int = None
+    coordinates: tuple = None
+    distance: int = None
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def strip_colors(text: str) -> str:
+    return COLOR_CODES.sub("", text)
+
+
+def command_family(command: str) -> str:
+    return command.strip().lstrip("/").split(" ", 1)[0].lower()
+
+
+def command_error(error: Exception) -> str:
+    """The response text for a command that failed with `error`. Timeouts have an empty message."""
+    return f"Command error: {str(error) or type(error).__name__}"
+
+
+def metric_command(command: str) -> str:
+    """The command name for metric labels, which must not grow with whatever users type."""
+    family = command_family(command)
+    return family if family in VANILLA_COMMANDS else "other"
+
+
+def _parse_list(result: RconResult):
+    for pattern in LIST_PATTERNS:
+        match = pattern.match(result.text)
+        if match:
+            result.count, result.max = int(match.group(1)), int(match.group(2))
+            result.players = [name.strip() for name in match.group(3).split(",") if name.strip()]
+            return
+
+
+def _parse_banlist(result: RconResult):
+    if BANLIST_EMPTY.match(result.text):
+        result.count = 0
+        return
+    for pattern in BANLIST_PATTERNS:
+        match = pattern.match(result.text)
+        if not match:
+            continue
+        result.count = int(match.group(1))
+        body = match.group(2)
+        if " was banned by " not in body:
+            # Before 1.13 the list is just comma separated names
+            result.players = [name.strip() for name in body.split(",") if name.strip()]
+            result.entries = list(result.players)
+            return
+        # Entries are separated by newlines on newer servers and run together
+        # on older ones, so cut at each "<name> was banned by" instead
+        starts = [entry.start() for entry in BAN_ENTRY.finditer(body)]
+        result.entries = [body[start:end].strip() for start, end in zip(starts, starts[1:] + [len(body)])]
+        result.players = [BAN_ENTRY.match(entry).group(1) for entry in result.entries]
+        return
+
+
+def _parse_seed(result: RconResult):
+    for pattern in SEED_PATTERNS:
+        match = pattern.match(result.text)
+        if match:
+            result.seed = int(match.group(1))
+            return
+
+
+def _parse_locate(result: RconResult):
+    match = LOCATE_PATTERNS[0].search(result.text)
+    if match:
+        x, y, z, distance = match.groups()
+        result.coordinates = (int(x), None if y == "~" else int(y), int(z))
+        result.distance = int(distance) if distance else None
+        return
+    match = LOCATE_PATTERNS[1].match(result.text)
+    if match:
+        result.coordinates = (int(match.group(1)), None, int(match.group(2)))
+
+
+FAMILY_PARSERS = {
+    "list": _parse_list,
+    "banlist": _parse_banlist,
+    "seed": _parse_seed,
+    "locate": _parse_locate,
+    "locatebiome": _parse_locate,
+}
+
+
+def parse_response(command: str, response: str) -> RconResult:
+    text = strip_colors(response).strip()
+    result = RconResult(command=command, text=text)
+    for kind, pattern in ERROR_PATTERNS:
+        if pattern.search(text):
+            result.success = False
+            result.error = kind
+            return result
+
+    parser = FAMILY_PARSERS.get(command_family(command))
+    if parser is not None:
+        parser(result)
+    return result
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+
+def command_name(command: str) -> str:
+    return command.strip().lstrip("/").split(" ", 1)[0].lower()
+
+
+class ResponseCache:
+    """Caches responses of read-only RCON commands.
+
+    `policies` maps a command name to how many seconds its response stays
+    valid, `invalidations` maps a command name to the cached commands that a
+    successful run of it makes stale. Identical requests that arrive while one
+    is already running share its result.
+    """
+
+    def __init__(self, policies: dict, invalidations: dict = None, counter=None):
+        self.policies = policies
+        self.invalidations = invalidations or {}
+        self.counter = counter
+        self.stats = {"hit": 0, "miss": 0, "coalesced": 0}
+        self._entries = {}
+        self._in_flight = {}
+
+    def cacheable(self, command: str) -> bool:
+        return command_name(command) in self.policies
+
+    def _record(self, result: str, command: str):
+        self.stats[result] += 1
+        if self.counter is not None:
+            self.counter.inc(command=command_name(command), result=result)
+
+    async def get(self, server: str, command: str, fetch, is_error=None) -> str:
+        """Return the cached response or run `fetch()` once for everyone waiting on it.
+
+        Responses for which `is_error(response)` is true are never stored.
+        """
+        key = (server, command.strip().lstrip("/").lower())
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            self._record("hit", command)
+            return entry[1]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._record("coalesced", command)
+            return await asyncio.shield(task)
+
+        self._record("miss", command)
+        task = asyncio.create_task(fetch())
+        self._in_flight[key] = task
+        try:
+            response = await asyncio.shield(task)
+        finally:
+            # Invalidated while running, so the response may already be stale
+            current = self._in_flight.get(key) is task
+            if current:
+                del self._in_flight[key]
+        if current and (is_error is None or not is_error(response)):
+            self._entries[key] = (time.monotonic() + self.policies[command_name(command)], response)
+        return response
+
+    def clear(self, server: str):
+        """Drop everything cached for `server`, for when it restarts and may have a new world."""
+        for entries in (self._entries, self._in_flight):
+            for key in [key for key in entries if key[0] == server]:
+                del entries[key]
+
+    def invalidate(self, server: str, command: str):
+        """Drop everything made stale by a successful run of `command`."""
+        stale = self.invalidations.get(command_name(command))
+        if not stale:
+            return
+        for entries in (self._entries, self._in_flight):
+            for key in [key for key in entries if key[0] == server and command_name(key[1]) in stale]:
+                del entries[key]
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import os
+from persistence import DebouncedSave, write_json
+
+
+class AdminRoles:
+    """Admin role IDs, indexed per guild.
+
+    IDs in the top level `allowed_role_ids` list apply to every guild, the ones
+    under `guilds` only to that guild. Changes are written behind, debounced and
+    atomically, and the file is reloaded when it is edited by hand.
+    """
+
+    def __init__(self, path: str, debounce: float = 2.0):
+        self.path = path
+        self._global = set()
+        self._guilds = {}
+        self._mtime = None
+        self._save = DebouncedSave(path, self._serialize, debounce, write=self._write)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            print(f"{self.path} not found. Creating a new one...")
+            self._write(self._serialize())
+            return
+        except json.JSONDecodeError:
+            print(f"Error reading {self.path}. Check the file format.")
+            return
+        self._global = set(data.get("allowed_role_ids", []))
+        self._guilds = {int(guild_id): set(role_ids) for guild_id, role_ids in data.get("guilds", {}).items()}
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    async def reload_if_changed(self):
+        # Our own pending changes win over an external edit
+        if self._save.pending:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            await asyncio.to_thread(self.load)
+            print(f"{self.path} changed, admin roles reloaded.")
+
+    def is_admin(self, guild_id, role_ids) -> bool:
+        guild_roles = self._guilds.get(guild_id, ())
+        return any(role_id in self._global or role_id in guild_roles for role_id in role_ids)
+
+    def roles(self, guild_id) -> set:
+        return self._global | self._guilds.get(guild_id, set())
+
+    def add(self, guild_id, role_id) -> bool:
+        if role_id in self.roles(guild_id):
+            return False
+        self._guilds.setdefault(guild_id, set()).add(role_id)
+        self._save.schedule()
+        return True
+
+    def remove(self, guild_id, role_id) -> bool:
+        if role_id not in self.roles(guild_id):
+            return False
+        self._global.discard(role_id)
+        self._guilds.get(guild_id, set()).discard(role_id)
+        self._save.schedule()
+        return True
+
+    def _serialize(self) -> dict:
+        return {
+            "allowed_role_ids": sorted(self._global),
+            "guilds": {str(guild_id): sorted(role_ids) for guild_id, role_ids in self._guilds.items() if role_ids},
+        }
+
+    def _write(self, data: dict):
+        write_json(self.path, data, indent=4)
+        self._mtime = os.stat(self.path).st_mtime_ns
@@ -0,0 +1,240 @@
+import asyncio
+import dataclasses
+import functools
+import heapq
+import json
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from persistence import DebouncedSave
+
+INTERVAL = re.compile(r"^(?:(\d+)d)?(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?$")
+MIN_INTERVAL = 10
+
+# minute, hour, day of month, month, day of week (0 or 7 is Sunday)
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+MISSED_POLICIES = ("skip", "run")
+
+
+def _parse_cron_field(text: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in text.split(","):
+        part, slash, step = part.partition("/")
+        step = int(step) if slash else 1
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if slash else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"{text!r} is out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """A standard five field cron expression, in the bot's local time."""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError("a cron expression has 5 fields: minute hour day month weekday")
+        self.expression = expression
+        parsed = [_parse_cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        # Like cron, a restricted day and weekday match when either does
+        if not self.any_day and not self.any_weekday:
+            return day or weekday
+        return day and weekday
+
+    def next_after(self, timestamp: float) -> float:
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Skips a whole month, day or hour at a time, so this ends within a few thousand steps
+        for _ in range(10000):
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"{self.expression!r} never matches")
+
+    def __str__(self) -> str:
+        return self.expression
+
+
+class IntervalSchedule:
+    def __init__(self, text: str, seconds: int):
+        self.text = text
+        self.seconds = seconds
+
+    def next_after(self, timestamp: float) -> float:
+        return timestamp + self.seconds
+
+    def __str__(self) -> str:
+        return f"every {self.text}"
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_schedule(text: str):
+    """Parse "10m", "every 1h30m" or a cron expression like "0 4 * * *"."""
+    text = text.strip().lower()
+    interval = text[6:].strip() if text.startswith("every ") else text
+    match = INTERVAL.match(interval)
+    if match and interval:
+        days, hours, minutes, seconds = (int(value or 0) for value in match.groups())
+        total = days * 86400 + hours * 3600 + minutes * 60 + seconds
+        if total < MIN_INTERVAL:
+            raise ValueError(f"the shortest interval is {MIN_INTERVAL} seconds")
+        return IntervalSchedule(interval, total)
+    schedule = CronSchedule(text)
+    # Catches expressions like "0 0 31 2 *" that never fire
+    schedule.next_after(time.time())
+    return schedule
+
+
+@dataclass
+class Job:
+    id: int
+    server: str
+    command: str
+    schedule: str
+    missed: str = "skip"
+    next_run: float = 0.0
+    created_by: str = ""
+    last_run: float = None
+    last_success: bool = None
+
+
+class Scheduler:
+    """Runs RCON commands on interval or cron schedules.
+
+    Due times sit in a heap and the loop sleeps until the earliest one, so
+    idle jobs cost nothing. At most `concurrency` jobs run at once, leaving
+    the RCON pool to interactive commands. Jobs are saved to `path`, and a
+    run missed while the bot was down is either skipped or run once on
+    startup, depending on the job's `missed` policy.
+    """
+
+    def __init__(self, path: str, run, concurrency: int = 2, on_failure=None, debounce: float = 1.0):
+        self.path = path
+        self.run = run
+        self.on_failure = on_failure
+        self.jobs = {}
+        self._heap = []
+        self._running = set()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wake = asyncio.Event()
+        self._task = None
+        self._save = DebouncedSave(path, self._serialize, debounce)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError:
+            print(f"Error reading {self.path}. Check the file format.")
+            return
+        now = time.time()
+        for entry in data.get("jobs", []):
+            job = Job(**entry)
+            try:
+                schedule = parse_schedule(job.schedule)
+            except ValueError as error:
+                print(f"Skipping scheduled job {job.id} ({job.schedule}): {error}")
+                continue
+            if job.next_run < now:
+                job.next_run = now if job.missed == "run" else schedule.next_after(now)
+            self.jobs[job.id] = job
+            heapq.heappush(self._heap, (job.next_run, job.id))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    def add(self, server: str, command: str, schedule: str, missed: str = "skip", created_by: str = "") -> Job:
+        """Add a job. Raises ValueError for a schedule that cannot be parsed."""
+        if missed not in MISSED_POLICIES:
+            raise ValueError(f"missed must be one of {', '.join(MISSED_POLICIES)}")
+        next_run = parse_schedule(schedule).next_after(time.time())
+        job = Job(
+            id=max(self.jobs, default=0) + 1, server=server, command=command, schedule=schedule,
+            missed=missed, next_run=next_run, created_by=created_by
+        )
+        self.jobs[job.id] = job
+        heapq.heappush(self._heap, (job.next_run, job.id))
+        self._wake.set()
+        self._save.schedule()
+        return job
+
+    def remove(self, job_id: int) -> bool:
+        # The heap entry is dropped when it comes up
+        if self.jobs.pop(job_id, None) is None:
+            return False
+        self._save.schedule()
+        return True
+
+    async def _loop(self):
+        while True:
+            self._wake.clear()
+            # Drop entries of removed or rescheduled jobs
+            while self._heap:
+                next_run, job_id = self._heap[0]
+                job = self.jobs.get(job_id)
+                if job is not None and job.next_run == next_run:
+                    break
+                heapq.heappop(self._heap)
+            if not self._heap:
+                await self._wake.wait()
+                continue
+            delay = next_run - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            job.next_run = parse_schedule(job.schedule).next_after(max(time.time(), next_run))
+            heapq.heappush(self._heap, (job.next_run, job.id))
+            if job.id in self._running:
+                print(f"Scheduled job {job.id} is still running, skipping this run.")
+            else:
+                self._running.add(job.id)
+                asyncio.create_task(self._execute(job))
+            self._save.schedule()
+
+    async def _execute(self, job: Job):
+        try:
+            async with self._semaphore:
+                result = await self.run(job.command, job.server)
+            job.last_run = time.time()
+            job.last_success = result.success
+            if not result.success and self.on_failure is not None:
+                await self.on_failure(job, result)
+        except Exception as error:
+            print(f"Error running scheduled job {job.id}: {error}")
+        finally:
+            self._running.discard(job.id)
+
+    def _serialize(self) -> dict:
+        return {"jobs": [dataclasses.asdict(job) for job in sorted(self.jobs.values(), key=lambda job: job.id)]}
@@ -0,0 +1,210 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    server TEXT NOT NULL,
+    player TEXT NOT NULL COLLATE NOCASE,
+    joined REAL NOT NULL,
+    left REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_player_left ON sessions (player, left);
+CREATE INDEX IF NOT EXISTS sessions_left ON sessions (left);
+CREATE TABLE IF NOT EXISTS playtime (
+    server TEXT NOT NULL,
+    player TEXT NOT NULL COLLATE NOCASE,
+    seconds REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (server, player)
+);
+CREATE INDEX IF NOT EXISTS playtime_seconds ON playtime (seconds);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+class SessionTracker:
+    """Records player sessions by diffing the online players between status polls.
+
+    Join and leave events are queued in memory and written in batches on a
+    single worker thread, so the event loop never waits on SQLite. Total
+    playtime per player is kept in its own table, which keeps /top and
+    /playtime independent of how many sessions have been recorded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sessions")
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._online = {}
+        self._joins = []
+        self._leaves = []
+        self._last_seen = None
+        self._saved_last_seen = None
+        self._close_open_sessions()
+
+    def _close_open_sessions(self):
+        # Sessions left open by the previous run end at its last poll, so the
+        # time the bot was down is not counted as playtime
+        row = self._db.execute("SELECT value FROM state WHERE key = 'last_seen'").fetchone()
+        last_seen = row[0] if row else None
+        open_sessions = self._db.execute("SELECT id, server, player, joined FROM sessions WHERE left IS NULL").fetchall()
+        with self._db:
+            for session_id, server, player, joined in open_sessions:
+                left = max(joined, last_seen or joined)
+                self._db.execute("UPDATE sessions SET left = ? WHERE id = ?", (left, session_id))
+                self._db.execute(
+                    "INSERT INTO playtime (server, player, seconds) VALUES (?, ?, ?) "
+                    "ON CONFLICT (server, player) DO UPDATE SET seconds = seconds + excluded.seconds",
+                    (server, player, left - joined),
+                )
+
+    def observe(self, server: str, players, now: float = None):
+        """Record who is online on `server`. Pass an empty list when the server went offline."""
+        now = now or time.time()
+        self._last_seen = now
+        online = self._online.setdefault(server, {})
+        current = set(players)
+        for player in current - online.keys():
+            online[player] = now
+            self._joins.append((server, player, now))
+        for player in online.keys() - current:
+            self._leaves.append((now, server, player, now - online.pop(player)))
+
+    def online(self, player: str):
+        """The server `player` is on right now and since when, or None."""
+        for server, players in self._online.items():
+            for name, joined in players.items():
+                if name.lower() == player.lower():
+                    return server, joined
+        return None
+
+    def _write(self, joins: list, leaves: list, last_seen: float):
+        with self._db:
+            self._db.executemany("INSERT INTO sessions (server, player, joined) VALUES (?, ?, ?)", joins)
+            self._db.executemany(
+                "UPDATE sessions SET left = ? WHERE server = ? AND player = ? AND left IS NULL",
+                [(left, server, player) for left, server, player, _ in leaves],
+            )
+            self._db.executemany(
+                "INSERT INTO playtime (server, player, seconds) VALUES (?, ?, ?) "
+                "ON CONFLICT (server, player) DO UPDATE SET seconds = seconds + excluded.seconds",
+                [(server, player, seconds) for _, server, player, seconds in leaves],
+            )
+            if last_seen is not None:
+                self._db.execute(
+                    "INSERT INTO state (key, value) VALUES ('last_seen', ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                    (last_seen,),
+                )
+
+    async def flush(self):
+        last_seen = self._last_seen
+        if not self._joins and not self._leaves and last_seen == self._saved_last_seen:
+            return
+        joins, self._joins = self._joins, []
+        leaves, self._leaves = self._leaves, []
+        try:
+            await self._run(self._write, joins, leaves, last_seen)
+            self._saved_last_seen = last_seen
+        except sqlite3.Error as error:
+            print(f"Error writing sessions: {error}")
+            # Keep the events for the next flush
+            self._joins = joins + self._joins
+            self._leaves = leaves + self._leaves
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _query(self, sql: str, parameters: tuple) -> list:
+        return self._db.execute(sql, parameters).fetchall()
+
+    async def playtime(self, player: str, server: str = None) -> float:
+        await self.flush()
+        sql = "SELECT COALESCE(SUM(seconds), 0) FROM playtime WHERE player = ?"
+        parameters = (player,)
+        if server:
+            sql += " AND server = ?"
+            parameters += (server,)
+        rows = await self._run(self._query, sql, parameters)
+        seconds = rows[0][0]
+        current = self.online(player)
+        if current is not None and (not server or current[0] == server):
+            seconds += time.time() - current[1]
+        return seconds
+
+    async def seen(self, player: str):
+        """Where and when `player` was last online, or None if never seen."""
+        await self.flush()
+        rows = await self._run(
+            self._query,
+            "SELECT server, player, left FROM sessions WHERE player = ? AND left IS NOT NULL ORDER BY left DESC LIMIT 1",
+            (player,),
+        )
+        return rows[0] if rows else None
+
+    async def recent_players(self, limit: int = 5000) -> list:
+        """Names of the players seen most recently."""
+        rows = await self._run(
+            self._query, "SELECT player FROM sessions GROUP BY player ORDER BY MAX(joined) DESC LIMIT ?", (limit,)
+        )
+        return [player for player, in rows]
+
+    async def top(self, limit: int = 10, server: str = None, days: float = None) -> list:
+        """Players with the most playtime, overall or over the last `days` days."""
+        await self.flush()
+        if days is None:
+            sql = "SELECT player, SUM(seconds) AS total FROM playtime"
+            parameters = ()
+            if server:
+                sql += " WHERE server = ?"
+                parameters = (server,)
+            sql += " GROUP BY player ORDER BY total DESC LIMIT ?"
+            rows = await self._run(self._query, sql, parameters + (limit,))
+        else:
+            now = time.time()
+            since = now - days * 86400
+            sql = (
+                "SELECT player, SUM(MIN(COALESCE(left, ?), ?) - MAX(joined, ?)) AS total FROM sessions "
+                "WHERE (left >= ? OR left IS NULL)"
+            )
+            parameters = (now, now, since, since)
+            if server:
+                sql += " AND server = ?"
+                parameters += (server,)
+            sql += " GROUP BY player ORDER BY total DESC LIMIT ?"
+            # Running sessions are already counted up to now
+            return await self._run(self._query, sql, parameters + (limit,))
+
+        # Add the sessions that are still running. Players outside the top
+        # rows can only move up if they are online, so look those up too.
+        now = time.time()
+        running = {}
+        for name, players in self._online.items():
+            if server and name != server:
+                continue
+            for player, joined in players.items():
+                running[player] = running.get(player, 0) + now - joined
+        totals = dict(rows)
+        names = {player.lower(): player for player in totals}
+        online = list(running)
+        for start in range(0, len(online), 500):
+            chunk = online[start:start + 500]
+            sql = f"SELECT player, SUM(seconds) FROM playtime WHERE player IN ({', '.join('?' * len(chunk))})"
+            parameters = tuple(chunk)
+            if server:
+                sql += " AND server = ?"
+                parameters += (server,)
+            for player, seconds in await self._run(self._query, sql + " GROUP BY player", parameters):
+                names.setdefault(player.lower(), player)
+                totals[names[player.lower()]] = seconds
+        for player, seconds in running.items():
+            name = names.setdefault(player.lower(), player)
+            totals[name] = totals.get(name, 0) + seconds
+        return sorted(totals.items(), key=lambda row: row[1], reverse=True)[:limit]
@@ -0,0 +1,262 @@
+import asyncio
+import ipaddress
+import time
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+import json
+import os
+import struct
+from mcstatus.responses import JavaStatusResponse
+
+
+class AddressCache:
+    """Caches resolved server addresses for as long as their DNS records allow.
+
+    Only the very first lookup for a host happens on the caller's path. After
+    that, expired entries keep being served while a background task refreshes
+    them, and a failed refresh keeps the last known good address.
+    """
+
+    def __init__(self, srv: bool = False, min_ttl: float = 30.0, max_ttl: float = 3600.0, timeout: float = 3.0):
+        self.srv = srv
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.timeout = timeout
+        self._entries = {}
+        self._refreshing = {}
+
+    async def resolve(self, host: str, port: int):
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is None:
+            await self._refresh(key)
+            return self._entries[key][0]
+        if time.monotonic() >= entry[1] and key not in self._refreshing:
+            self._refreshing[key] = asyncio.create_task(self._refresh(key))
+        return entry[0]
+
+    async def _refresh(self, key):
+        try:
+            address, ttl = await self._lookup(*key)
+            ttl = min(max(ttl, self.min_ttl), self.max_ttl)
+            self._entries[key] = (address, time.monotonic() + ttl)
+        except (dns.exception.DNSException, OSError) as error:
+            print(f"Error resolving {key[0]}: {error}")
+            # Keep the last known good address and try again later. Until a
+            # lookup succeeds, the connection resolves the name itself.
+            address = self._entries[key][0] if key in self._entries else key
+            self._entries[key] = (address, time.monotonic() + self.min_ttl)
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def _lookup(self, host: str, port: int):
+        try:
+            ipaddress.ip_address(host)
+            return (host, port), self.max_ttl
+        except ValueError:
+            pass
+
+        ttl = self.max_ttl
+        if self.srv:
+            try:
+                answer = await dns.asyncresolver.resolve(f"_minecraft._tcp.{host}", "SRV", lifetime=self.timeout)
+                record = answer[0]
+                host, port = str(record.target).rstrip("."), int(record.port)
+                ttl = answer.rrset.ttl
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                pass
+
+        try:
+            answer = await dns.asyncresolver.resolve(host, "A", lifetime=self.timeout)
+        except dns.resolver.NoAnswer:
+            answer = await dns.asyncresolver.resolve(host, "AAAA", lifetime=self.timeout)
+        return (str(answer[0]), port), min(ttl, answer.rrset.ttl)
+
+
+def _varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+async def _read_varint(reader: asyncio.StreamReader) -> int:
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result
+    raise ValueError("VarInt is too big")
+
+
+def _decode_varint(data: bytes, offset: int = 0):
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, offset
+    raise ValueError("VarInt is too big")
+
+
+def _slp_packet(packet_id: int, payload: bytes = b"") -> bytes:
+    data = _varint(packet_id) + payload
+    return _varint(len(data)) + data
+
+
+async def _read_slp_packet(reader: asyncio.StreamReader) -> bytes:
+    length = await _read_varint(reader)
+    return await reader.readexactly(length)
+
+
+async def probe_minecraft_server(connect_host: str, connect_port: int, hostname: str = None):
+    """Read the status and measure latency over a single Server List Ping connection.
+
+    Returns the status response, the ping in milliseconds and how long each
+    step of the probe took, also in milliseconds.
+    """
+    hostname = hostname or connect_host
+    timings = {}
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(connect_host, connect_port)
+    try:
+        mark = time.perf_counter()
+        timings["connect"] = (mark - started) * 1000
+
+        # The handshake and the status request go out together, so "status"
+        # is the round trip for both
+        host = hostname.encode("utf8")
+        handshake = _varint(47) + _varint(len(host)) + host + struct.pack(">H", connect_port) + _varint(1)
+        writer.write(_slp_packet(0x00, handshake) + _slp_packet(0x00))
+        await writer.drain()
+        packet = await _read_slp_packet(reader)
+        if packet[0] != 0x00:
+            raise ValueError(f"Unexpected status packet {packet[0]}")
+        length, offset = _decode_varint(packet, 1)
+        raw = json.loads(packet[offset:offset + length].decode("utf8"))
+        timings["status"] = (time.perf_counter() - mark) * 1000
+
+        mark = time.perf_counter()
+        token = os.urandom(8)
+        writer.write(_slp_packet(0x01, token))
+        await writer.drain()
+        packet = await _read_slp_packet(reader)
+        if packet[0] != 0x01 or packet[1:] != token:
+            raise ValueError("Ping token mismatch")
+        latency = (time.perf_counter() - mark) * 1000
+        timings["ping"] = latency
+    finally:
+        writer.close()
+
+    timings["total"] = (time.perf_counter() - started) * 1000
+    return JavaStatusResponse.build(raw, latency=latency), latency, timings
+
+
+async def query_minecraft_server(
+    ip: str, port: int, resolver: AddressCache = None, timeout: float = 5.0, query_port: int = None, query_client=None
+):
+    try:
+        connect_host, connect_port = ip, port
+        if resolver is not None:
+            connect_host, connect_port = await resolver.resolve(ip, port)
+        # The UDP query runs next to the status ping, so it adds no latency. It
+        # sends up to 3 requests, each gets a third of the time.
+        probes = [asyncio.wait_for(probe_minecraft_server(connect_host, connect_port, hostname=ip), timeout)]
+        if query_client is not None and query_port:
+            probes.append(asyncio.wait_for(query_client.full_stat(connect_host, query_port, timeout / 3), timeout))
+        results = await asyncio.gather(*probes, return_exceptions=True)
+        if isinstance(results[0], Exception):
+            raise results[0]
+        status, latency, timings = results[0]
+
+        full_stat = results[1] if len(results) > 1 else None
+        if isinstance(full_stat, Exception):
+            print(f"Error querying {ip}:{query_port} over UDP: {full_stat!r}")
+            full_stat = None
+
+        if full_stat is not None:
+            player_names = full_stat["player_names"]
+        elif status.players.sample:
+            player_names = [player.name for player in status.players.sample]
+        else:
+            player_names = []
+
+        data = {
+            "online": True,
+            "version": status.version.name,
+            "players_online": status.players.online,
+            "max_players": status.players.max,
+            "description": status.description,
+            "player_names": player_names,
+            "ping": latency,
+            "timings": timings,
+        }
+        if full_stat is not None:
+            data.update(software=full_stat["software"], plugins=full_stat["plugins"], map=full_stat["map"])
+        return data
+    except Exception as error:
+        print(f"Error querying the server: {error}")
+        return {"online": False}
+
+
+class StatusCache:
+    """Shares status probes between everything that needs server status.
+
+    Results are kept for `ttl` seconds and concurrent callers for the same
+    server wait on a single in-flight probe instead of starting their own.
+    """
+
+    def __init__(self, ttl: float = 30.0, resolver: AddressCache = None, timeout: float = 5.0, probe=query_minecraft_server):
+        self.ttl = ttl
+        self.resolver = resolver
+        self.timeout = timeout
+        self.probe = probe
+        self._snapshots = {}
+        self._in_flight = {}
+
+    async def get(self, ip: str, port: int, max_age: float = None) -> dict:
+        """The status of a server. `max_age` asks for a result newer than the cache TTL."""
+        key = (ip, port)
+        snapshot = self._snapshots.get(key)
+        ttl = self.ttl if max_age is None else min(self.ttl, max_age)
+        if snapshot is not None and time.monotonic() - snapshot[0] < ttl:
+            return self._with_age(snapshot)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key))
+            self._in_flight[key] = task
+        return self._with_age(await asyncio.shield(task))
+
+    async def get_many(self, addresses: list, concurrency: int = 10, max_age: float = None) -> list:
+        """Fetch the status of several servers at once, at most `concurrency` probes at a time."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get_one(address):
+            async with semaphore:
+                return await self.get(*address, max_age=max_age)
+
+        return await asyncio.gather(*(get_one(address) for address in addresses))
+
+    async def _refresh(self, key):
+        try:
+            data = await self.probe(*key, resolver=self.resolver, timeout=self.timeout)
+            snapshot = (time.monotonic(), time.time(), data)
+            self._snapshots[key] = snapshot
+            return snapshot
+        finally:
+            del self._in_flight[key]
+
+    @staticmethod
+    def _with_age(snapshot) -> dict:
+        fetched, fetched_at, data = snapshot
+        return {**data, "fetched_at": fetched_at, "age": time.monotonic() - fetched}
@@ -0,0 +1,40 @@
+import asyncio
+from circuit import CLOSED, OPEN, CircuitBreaker
+from rcon_parser import command_error, parse_response
+
+
+def test_timeout_counts_as_failure():
+    breaker = CircuitBreaker("main", failure_threshold=3)
+    result = parse_response("kick Steve", command_error(asyncio.TimeoutError()))
+    assert result.text == "Command error: TimeoutError"
+    assert not result.success
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record([result])
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_failures():
+    breaker = CircuitBreaker("main", failure_threshold=2)
+    breaker.record([parse_response("list", command_error(ConnectionRefusedError()))])
+    breaker.record([parse_response("list", "There are 0 of a max of 20 players online:")])
+    breaker.record([parse_response("list", command_error(ConnectionRefusedError()))])
+    assert breaker.state == CLOSED
+
+
+def test_single_failed_status_poll_does_not_open():
+    breaker = CircuitBreaker("main", failure_threshold=3)
+    breaker.report_status(False)
+    assert breaker.state == CLOSED
+    breaker.report_status(False)
+    breaker.report_status(False)
+    assert breaker.state == OPEN
+
+
+def test_online_status_ends_the_wait():
+    breaker = CircuitBreaker("main", failure_threshold=1, reset_timeout=30)
+    breaker.failure()
+    assert not breaker.allow()
+    breaker.report_status(True)
+    assert breaker.allow()
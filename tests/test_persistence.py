@@ -0,0 +1,34 @@
+import asyncio
+import json
+from persistence import DebouncedSave, write_json
+
+
+def test_write_json_replaces_the_file(tmp_path):
+    path = tmp_path / "data.json"
+    write_json(str(path), {"a": 1})
+    write_json(str(path), {"a": 2}, indent=4)
+    assert json.loads(path.read_text()) == {"a": 2}
+    assert not (tmp_path / "data.json.tmp").exists()
+
+
+def test_debounced_save_collects_a_burst(tmp_path):
+    path = tmp_path / "data.json"
+    writes = []
+    state = {"count": 0}
+
+    def write(data):
+        writes.append(data)
+        write_json(str(path), data)
+
+    async def scenario():
+        save = DebouncedSave(str(path), lambda: dict(state), delay=0.05, write=write)
+        for _ in range(5):
+            state["count"] += 1
+            save.schedule()
+        assert save.pending
+        await asyncio.sleep(0.2)
+        assert not save.pending
+
+    asyncio.run(scenario())
+    assert writes == [{"count": 5}]
+    assert json.loads(path.read_text()) == {"count": 5}
@@ -0,0 +1,81 @@
+import asyncio
+from benchmarks.fake_servers import FakeQueryServer
+from query import QueryClient, _parse_full_stat
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def query(servers, calls, timeout=1.0):
+    client = QueryClient()
+    try:
+        return await asyncio.gather(*(client.full_stat("127.0.0.1", servers[index].port, timeout) for index in calls))
+    finally:
+        client.close()
+
+
+def test_full_stat_uses_the_handshake_session():
+    async def scenario():
+        async with FakeQueryServer(players=["Alice", "Bob"], plugins="Paper on 1.21: WorldEdit 7.3; LuckPerms 5.4") as server:
+            (stat,) = await query([server], [0])
+            return stat, server
+
+    stat, server = run(scenario())
+    assert stat["player_names"] == ["Alice", "Bob"]
+    assert stat["players_online"] == 2
+    assert stat["software"] == "Paper on 1.21"
+    assert stat["plugins"] == ["WorldEdit 7.3", "LuckPerms 5.4"]
+    assert stat["map"] == "world"
+    assert server.ignored == 0
+
+
+def test_concurrent_queries_of_one_server_share_a_request():
+    async def scenario():
+        async with FakeQueryServer(latency=0.02) as server:
+            stats = await query([server], [0] * 5)
+            return stats, server
+
+    stats, server = run(scenario())
+    assert all(stat["player_names"] == ["Alice", "Bob"] for stat in stats)
+    assert server.handshakes == 1
+    assert server.requests == 1
+
+
+def test_concurrent_queries_of_several_servers():
+    async def scenario():
+        servers = [await FakeQueryServer(players=[f"Player{index}"], latency=0.01).start() for index in range(4)]
+        try:
+            return await query(servers, [0, 1, 2, 3, 0, 1])
+        finally:
+            for server in servers:
+                await server.stop()
+
+    stats = run(scenario())
+    assert [stat["player_names"] for stat in stats] == [["Player0"], ["Player1"], ["Player2"], ["Player3"], ["Player0"], ["Player1"]]
+
+
+def test_rotated_token_is_refreshed():
+    async def scenario():
+        async with FakeQueryServer() as server:
+            client = QueryClient()
+            try:
+                await client.full_stat("127.0.0.1", server.port, 0.2)
+                server.rotate()
+                stat = await client.full_stat("127.0.0.1", server.port, 0.2)
+            finally:
+                client.close()
+            return stat, server
+
+    stat, server = run(scenario())
+    assert stat["player_names"] == ["Alice", "Bob"]
+    assert server.handshakes == 2
+    assert server.ignored == 1
+
+
+def test_vanilla_full_stat_fields():
+    stat = _parse_full_stat(FakeQueryServer(players=[]).full_stat_payload())
+    assert stat["software"] == "vanilla"
+    assert stat["plugins"] == []
+    assert stat["player_names"] == []
+    assert stat["max_players"] == 20
@@ -0,0 +1,67 @@
+import asyncio
+from benchmarks.fake_servers import FakeRconServer
+from rcon import RconNotSentError, RconPool
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def send_all(commands, handler=None, **kwargs):
+    async with FakeRconServer("password", handler=handler, **kwargs) as server:
+        pool = RconPool("127.0.0.1", server.port, "password")
+        try:
+            replies = [await pool.command(command) for command in commands]
+        finally:
+            pool.close()
+        return replies, server
+
+
+def test_short_reply_takes_one_round_trip():
+    replies, server = run(send_all(["list", "seed"]))
+    assert replies == ["Echo: list", "Echo: seed"]
+    # One packet per command, no end marker
+    assert server.requests == 2
+    assert server.protocol_errors == 0
+
+
+def test_long_reply_is_reassembled():
+    replies, server = run(send_all(["banlist"], handler=lambda command: "x" * 10000, fragment=700))
+    assert replies == ["x" * 10000]
+    assert server.requests == 2
+    assert server.protocol_errors == 0
+
+
+def test_reply_of_exactly_one_part():
+    replies, server = run(send_all(["banlist", "list"], handler=lambda command: "y" * 4096 if command == "banlist" else "ok"))
+    assert replies == ["y" * 4096, "ok"]
+
+
+def test_multibyte_reply_is_split_by_characters():
+    text = "é" * 5000
+    replies, server = run(send_all(["banlist"], handler=lambda command: text))
+    assert replies == [text]
+
+
+async def run_pipeline(commands, timeouts, handler=None, **kwargs):
+    async with FakeRconServer("password", handler=handler, **kwargs) as server:
+        pool = RconPool("127.0.0.1", server.port, "password")
+        try:
+            return await pool.pipeline(commands, timeouts)
+        finally:
+            pool.close()
+
+
+def test_timeout_counts_from_sending():
+    # 20 commands at 50 ms each take a second, far over each 0.3 s timeout
+    commands = [f"say {index}" for index in range(20)]
+    replies = run(run_pipeline(commands, [0.3] * 20, latency=0.05))
+    assert replies == [f"Echo: {command}" for command in commands]
+
+
+def test_unsent_commands_after_a_timeout():
+    handler = lambda command: None if command == "hang" else f"Echo: {command}"
+    replies = run(run_pipeline(["first", "hang", "third", "fourth"], [1, 0.2, 1, 1], handler=handler))
+    assert replies[0] == "Echo: first"
+    assert isinstance(replies[1], asyncio.TimeoutError)
+    assert all(isinstance(reply, RconNotSentError) for reply in replies[2:])
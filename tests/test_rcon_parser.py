@@ -0,0 +1,30 @@
+from rcon_parser import parse_response
+
+
+def test_connection_error():
+    result = parse_response("kick Steve", "Command error: Connection refused")
+    assert not result.success
+    assert result.error == "connection"
+
+
+def test_connection_error_without_message():
+    # Timeouts have an empty message and the text is stripped before matching
+    result = parse_response("kick Steve x", "Command error: ")
+    assert not result.success
+    assert result.error == "connection"
+
+
+def test_unreachable():
+    result = parse_response("list", "Command error: Server unreachable, retrying in 12s")
+    assert result.error == "unreachable"
+
+
+def test_list():
+    result = parse_response("list", "There are 2 of a max of 20 players online: Steve, Alex")
+    assert result.success
+    assert (result.count, result.max, result.players) == (2, 20, ["Steve", "Alex"])
+
+
+def test_not_sent():
+    result = parse_response("save-all", "Command error: Not sent, the RCON connection closed first")
+    assert result.error == "not_sent"
@@ -0,0 +1,32 @@
+import asyncio
+import time
+from sessions import SessionTracker
+
+
+def test_top_includes_players_in_their_first_session(tmp_path):
+    async def scenario():
+        tracker = SessionTracker(str(tmp_path / "sessions.db"))
+        now = time.time()
+        tracker.observe("main", ["Steve", "Alex"], now=now - 300)
+        tracker.observe("main", ["Notch"], now=now - 200)
+        await tracker.flush()
+        return await tracker.top(limit=2)
+
+    top = asyncio.run(scenario())
+    assert len(top) == 2
+    assert top[0][0] == "Notch"
+    assert top[0][1] >= 200
+
+
+def test_restart_does_not_count_downtime(tmp_path):
+    path = str(tmp_path / "sessions.db")
+
+    async def scenario():
+        tracker = SessionTracker(path)
+        tracker.observe("main", ["Steve"], now=1000)
+        tracker.observe("main", ["Steve"], now=1600)
+        await tracker.flush()
+        restarted = SessionTracker(path)
+        return restarted.online("Steve"), await restarted.playtime("Steve")
+
+    assert asyncio.run(scenario()) == (None, 600)
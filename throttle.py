@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+
+class Throttle:
+    """Token buckets per user, guild and command.
+
+    `rate` tokens per second refill a bucket holding at most `burst`.
+    `overrides` maps a command's qualified name to its own (rate, burst).
+    """
+
+    def __init__(self, rate: float, burst: int, overrides: dict = None, max_buckets: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self.max_buckets = max_buckets
+        self._buckets = {}
+
+    def retry_after(self, user_id, guild_id, command: str) -> float:
+        """Take a token and return 0, or the seconds until one is available."""
+        rate, burst = self.overrides.get(command, (self.rate, self.burst))
+        now = time.monotonic()
+        key = (user_id, guild_id, command)
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+        self._buckets[key] = (tokens - 1, now)
+        if len(self._buckets) > self.max_buckets:
+            self._prune(now)
+        return 0.0
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely is the same as no bucket
+        for key, (tokens, updated) in list(self._buckets.items()):
+            rate, burst = self.overrides.get(key[2], (self.rate, self.burst))
+            if tokens + (now - updated) * rate >= burst:
+                del self._buckets[key]
+
+
+class InFlight:
+    """Collapses identical calls: while one runs, the same key waits for its result."""
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def run(self, key, function):
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # One caller giving up must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def __contains__(self, key) -> bool:
+        return key in self._tasks
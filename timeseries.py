@@ -0,0 +1,183 @@
+import base64
+import io
+import json
+import math
+import time
+from array import array
+from datetime import datetime
+from persistence import write_json
+
+try:
+    from matplotlib.figure import Figure
+except ImportError:
+    # Charts are optional, /graph says so when matplotlib is missing
+    Figure = None
+
+FIELDS = ("players", "max_players", "ping", "online")
+
+# (name, seconds per point, seconds kept, capacity). The raw tier is sized for
+# the fastest presence poll, older points are dropped when read.
+TIERS = (
+    ("raw", 0, 86400, 86400 // 15),
+    ("5m", 300, 30 * 86400, 30 * 86400 // 300),
+    ("1h", 3600, 365 * 86400, 365 * 86400 // 3600),
+)
+
+
+class RingBuffer:
+    """A fixed size buffer of timestamps plus one float column per field."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.columns = [array("f", bytes(4 * capacity)) for _ in FIELDS]
+        self.head = 0
+        self.count = 0
+
+    def append(self, timestamp: float, values):
+        self.times[self.head] = timestamp
+        for column, value in zip(self.columns, values):
+            column[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def points(self, since: float = 0):
+        """Yield (timestamp, values) oldest first, starting at `since`."""
+        start = (self.head - self.count) % self.capacity
+        for offset in range(self.count):
+            index = (start + offset) % self.capacity
+            if self.times[index] >= since:
+                yield self.times[index], tuple(column[index] for column in self.columns)
+
+    def dump(self) -> dict:
+        return {
+            "head": self.head,
+            "count": self.count,
+            "times": base64.b64encode(self.times.tobytes()).decode(),
+            "columns": [base64.b64encode(column.tobytes()).decode() for column in self.columns],
+        }
+
+    def restore(self, data: dict):
+        times = array("d", base64.b64decode(data["times"]))
+        columns = [array("f", base64.b64decode(column)) for column in data["columns"]]
+        if len(times) != self.capacity or len(columns) != len(FIELDS):
+            raise ValueError("snapshot does not match the buffer layout")
+        self.times, self.columns = times, columns
+        self.head, self.count = data["head"], data["count"]
+
+
+class Downsampler:
+    """Averages the samples of one bucket. NaN values (ping while offline) are skipped."""
+
+    def __init__(self, step: int):
+        self.step = step
+        self.bucket = None
+        self.sums = [0.0] * len(FIELDS)
+        self.counts = [0] * len(FIELDS)
+
+    def add(self, timestamp: float, values):
+        """Add a sample, returns the finished bucket when `timestamp` starts a new one."""
+        bucket = int(timestamp // self.step) * self.step
+        finished = None
+        if self.bucket is not None and bucket != self.bucket:
+            finished = self.bucket, [total / count if count else math.nan for total, count in zip(self.sums, self.counts)]
+            self.sums = [0.0] * len(FIELDS)
+            self.counts = [0] * len(FIELDS)
+        self.bucket = bucket
+        for index, value in enumerate(values):
+            if not math.isnan(value):
+                self.sums[index] += value
+                self.counts[index] += 1
+        return finished
+
+
+class ServerSeries:
+    def __init__(self):
+        self.buffers = {name: RingBuffer(capacity) for name, _, _, capacity in TIERS}
+        self.downsamplers = {name: Downsampler(step) for name, step, _, _ in TIERS if step}
+
+    def add(self, timestamp: float, values):
+        self.buffers["raw"].append(timestamp, values)
+        for name, downsampler in self.downsamplers.items():
+            finished = downsampler.add(timestamp, values)
+            if finished is not None:
+                self.buffers[name].append(*finished)
+
+
+class TimeSeriesStore:
+    """Server health history in fixed memory.
+
+    Every status poll goes into a raw tier for the last day, and is averaged
+    into 5 minute points for 30 days and hourly points for a year. All tiers
+    are ring buffers, so memory stays the same however long the bot runs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._series = {}
+        self.load()
+
+    def record(self, server: str, data: dict, timestamp: float = None):
+        timestamp = timestamp or time.time()
+        if data["online"]:
+            values = (data["players_online"], data["max_players"], data["ping"], 1)
+        else:
+            values = (0, math.nan, math.nan, 0)
+        series = self._series.get(server)
+        if series is None:
+            series = self._series[server] = ServerSeries()
+        series.add(timestamp, values)
+
+    def query(self, server: str, field: str, seconds: float):
+        """The tier covering the last `seconds` and its (timestamp, value) points for `field`."""
+        series = self._series.get(server)
+        if series is None:
+            return None, []
+        # The finest tier that reaches back far enough
+        name = next((name for name, _, kept, _ in TIERS if kept >= seconds), TIERS[-1][0])
+        index = FIELDS.index(field)
+        since = time.time() - seconds
+        return name, [(timestamp, values[index]) for timestamp, values in series.buffers[name].points(since)]
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError:
+            print(f"Error reading {self.path}. Starting without history.")
+            return
+        for server, buffers in data.items():
+            series = ServerSeries()
+            try:
+                for name, buffer in buffers.items():
+                    series.buffers[name].restore(buffer)
+            except (KeyError, ValueError) as error:
+                print(f"Skipping history of {server} in {self.path}: {error}")
+                continue
+            self._series[server] = series
+
+    def snapshot(self) -> dict:
+        """Copy of every buffer, taken on the event loop so it can be written from a thread."""
+        return {
+            server: {name: buffer.dump() for name, buffer in series.buffers.items()}
+            for server, series in self._series.items()
+        }
+
+    def write(self, data: dict):
+        write_json(self.path, data)
+
+
+def render_chart(title: str, label: str, points: list) -> bytes:
+    """Draw the points as a PNG line chart. Needs matplotlib."""
+    figure = Figure(figsize=(8, 4), dpi=100)
+    axes = figure.subplots()
+    axes.plot([datetime.fromtimestamp(timestamp) for timestamp, _ in points], [value for _, value in points], linewidth=1.5)
+    axes.set_title(title)
+    axes.set_ylabel(label)
+    axes.grid(alpha=0.3)
+    figure.autofmt_xdate()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()